@@ -1,75 +1,1217 @@
 import os
 import json
+import asyncio
 import random
-import shutil
 import time
-import google.generativeai as genai
+import hashlib
+import re
+import threading
+import atexit
+import uuid
+import itertools
+import contextvars
+import queue
+import heapq
+import unicodedata
+import base64
+import binascii
+import gzip
+import sqlite3
+import weakref
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextlib import contextmanager
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, wait
 import dotenv
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, g, has_request_context, \
+    has_app_context, Response, stream_with_context
 from datetime import timedelta
 from google.api_core import exceptions
+from model_backends import create_model_backend
+from list_snapshot import ListSnapshot
+from list_database import ListDatabase
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 dotenv.load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel("gemini-2.5-flash")
+GEMINI_MODEL_NAME = "gemini-2.5-flash"
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "gemini")
+model = create_model_backend(MODEL_BACKEND, GEMINI_MODEL_NAME, GEMINI_API_KEY)
 GEMINI_CACHE_DIR = 'gemini_cache'
+GEMINI_CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+GEMINI_CACHE_MEMORY_ITEMS = int(os.getenv("GEMINI_CACHE_MEMORY_ITEMS", "512"))
+GEMINI_CACHE_DISK_ITEMS = int(os.getenv("GEMINI_CACHE_DISK_ITEMS", "20000"))
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+GEMINI_TOKENS_PER_MINUTE = float(os.getenv("GEMINI_TOKENS_PER_MINUTE", "250000"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+GEMINI_BACKOFF_BASE_SECONDS = float(os.getenv("GEMINI_BACKOFF_BASE_SECONDS", "1"))
+GEMINI_BACKOFF_MAX_SECONDS = float(os.getenv("GEMINI_BACKOFF_MAX_SECONDS", "30"))
+GEMINI_MAX_RETRY_WAIT_SECONDS = float(os.getenv("GEMINI_MAX_RETRY_WAIT_SECONDS", "60"))
 
 topic_prompts = {}
-chat_sessions = {}
 
-SYSTEM_PROMPTS_PATH = os.path.join('prompts/general_system_prompts.json')
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "500"))
+CHAT_IDLE_TTL_SECONDS = float(os.getenv("CHAT_IDLE_TTL_SECONDS", "1800"))
+CHAT_MAX_HISTORY_MESSAGES = int(os.getenv("CHAT_MAX_HISTORY_MESSAGES", "40"))
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "3000"))
+CHAT_SUMMARIZE_TRIMMED_TURNS = os.getenv("CHAT_SUMMARIZE_TRIMMED_TURNS", "1") == "1"
+CHAT_SUMMARY_PREFIX = "ÖNCEKİ KONUŞMANIN ÖZETİ: "
+CHAT_SUMMARY_WORKERS = int(os.getenv("CHAT_SUMMARY_WORKERS", "2"))
+
+
+class ChatSessionManager:
+    def __init__(self, max_sessions, idle_ttl_seconds, max_history_messages, history_token_budget, summarizer=None):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_history_messages = max_history_messages
+        self.history_token_budget = history_token_budget
+        self.summarizer = summarizer
+        self.lock = threading.Lock()
+        self.sessions = OrderedDict()
+        # Özetler istek yolunda beklenmez; arka planda üretilir ve sohbetin sonraki turunda geçmişe eklenir.
+        self.summary_executor = ThreadPoolExecutor(max_workers=CHAT_SUMMARY_WORKERS, thread_name_prefix="chat-summary")
+        self.pending_summaries = weakref.WeakKeyDictionary()
+        self.counters = {"created": 0, "evicted_lru": 0, "evicted_idle": 0, "dropped": 0, "trimmed_messages": 0,
+                         "summaries": 0, "summary_failures": 0}
+
+    def _evict_idle(self, now):
+        # Oturumlar son kullanıma göre sıralı; boşta kalanlar her zaman baştadır.
+        while self.sessions:
+            key, (_, last_used) = next(iter(self.sessions.items()))
+            if now - last_used <= self.idle_ttl_seconds:
+                break
+            del self.sessions[key]
+            self.counters["evicted_idle"] += 1
+
+    def get(self, key):
+        now = time.monotonic()
+        with self.lock:
+            self._evict_idle(now)
+            item = self.sessions.get(key)
+            if item is None:
+                return None
+            self.sessions[key] = (item[0], now)
+            self.sessions.move_to_end(key)
+            return item[0]
+
+    def put(self, key, chat):
+        now = time.monotonic()
+        with self.lock:
+            self._evict_idle(now)
+            self.sessions[key] = (chat, now)
+            self.sessions.move_to_end(key)
+            self.counters["created"] += 1
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.counters["evicted_lru"] += 1
+
+    def drop(self, key):
+        with self.lock:
+            if self.sessions.pop(key, None) is not None:
+                self.counters["dropped"] += 1
+
+    @staticmethod
+    def _message_text(message):
+        return "".join(getattr(part, 'text', '') for part in message.parts)
+
+    @classmethod
+    def _split_summary(cls, history):
+        # İlk mesaj konu prompt'udur ve korunur; varsa hemen ardından önceki turların özeti gelir.
+        if len(history) > 1 and history[1].role == 'user':
+            text = cls._message_text(history[1])
+            if text.startswith(CHAT_SUMMARY_PREFIX):
+                return text[len(CHAT_SUMMARY_PREFIX):], 2
+        return None, 1
+
+    def _summarize(self, previous, summary, conversation):
+        # Önceki özet hâlâ üretiliyorsa onun sonucu üzerine yazılır; hata olursa eldeki özet korunur.
+        if previous is not None:
+            summary = previous.result() or summary
+        try:
+            summary = self.summarizer(summary, conversation) or summary
+            with self.lock:
+                self.counters["summaries"] += 1
+        except Exception as e:
+            print(f"Sohbet özeti üretilemedi, eski turlar yalnızca kırpılıyor: {e}")
+            with self.lock:
+                self.counters["summary_failures"] += 1
+        return summary
+
+    def apply_pending_summary(self, chat):
+        # Sıradaki her özet öncekini içerir; bitmiş en yeni özet uygulanır, daha yenileri beklemede kalır.
+        with self.lock:
+            futures = self.pending_summaries.get(chat, [])
+            done = [i for i, future in enumerate(futures) if future.done()]
+            if not done:
+                return
+            future = futures[done[-1]]
+            if done[-1] == len(futures) - 1:
+                del self.pending_summaries[chat]
+            else:
+                self.pending_summaries[chat] = futures[done[-1] + 1:]
+        summary = future.result()
+        if summary:
+            history = chat.history
+            _, first_turn = self._split_summary(history)
+            chat.history = history[:1] + [{'role': 'user', 'parts': [CHAT_SUMMARY_PREFIX + summary]}] + \
+                history[first_turn:]
+
+    def trim_history(self, chat):
+        self.apply_pending_summary(chat)
+        history = chat.history
+        summary, first_turn = self._split_summary(history)
+        turns = history[first_turn:]
+
+        overflow = max(0, len(turns) - self.max_history_messages)
+        tokens = sum(estimate_tokens(self._message_text(message)) for message in turns[overflow:])
+        if tokens > self.history_token_budget:
+            # Bütçe aşılınca bütçenin yarısına inilir; özet her turda değil arada bir üretilir.
+            while overflow < len(turns) - 2 and tokens > self.history_token_budget // 2:
+                tokens -= estimate_tokens(self._message_text(turns[overflow]))
+                overflow += 1
+        if overflow <= 0:
+            return
+
+        # Kalan kısım bir kullanıcı mesajıyla başlamalıdır.
+        start = overflow
+        while start < len(turns) and turns[start].role != 'user':
+            start += 1
+        dropped = turns[:start]
+
+        if self.summarizer is not None:
+            conversation = "\n".join(f"{message.role}: {self._message_text(message)}" for message in dropped)
+            with self.lock:
+                futures = self.pending_summaries.get(chat, [])
+                previous = futures[-1] if futures else None
+                self.pending_summaries[chat] = futures + [self.summary_executor.submit(
+                    self._summarize, previous, summary or "", conversation)]
+
+        summary_messages = [{'role': 'user', 'parts': [CHAT_SUMMARY_PREFIX + summary]}] if summary else []
+        chat.history = history[:1] + summary_messages + turns[start:]
+        with self.lock:
+            self.counters["trimmed_messages"] += len(dropped)
+
+    @staticmethod
+    def _history_bytes(chat):
+        total = 0
+        for message in chat.history:
+            for part in message.parts:
+                total += len(getattr(part, 'text', '').encode('utf-8'))
+        return total
+
+    def stats(self):
+        now = time.monotonic()
+        with self.lock:
+            self._evict_idle(now)
+            items = list(self.sessions.items())
+            counters = dict(self.counters)
+
+        topics = {}
+        history_messages = 0
+        history_bytes = 0
+        for (_, topic_id), (chat, _) in items:
+            topics[topic_id] = topics.get(topic_id, 0) + 1
+            history_messages += len(chat.history)
+            history_bytes += self._history_bytes(chat)
+
+        return {
+            "live_sessions": len(items),
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "max_history_messages": self.max_history_messages,
+            "history_token_budget": self.history_token_budget,
+            "summarize_trimmed_turns": self.summarizer is not None,
+            "pending_summaries": len(self.pending_summaries),
+            "history_messages": history_messages,
+            "history_bytes": history_bytes,
+            "sessions_per_topic": topics,
+            "counters": counters
+        }
+
+
+chat_sessions = ChatSessionManager(CHAT_MAX_SESSIONS, CHAT_IDLE_TTL_SECONDS, CHAT_MAX_HISTORY_MESSAGES,
+                                   CHAT_HISTORY_TOKEN_BUDGET)
+
+METRICS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+GEMINI_INPUT_COST_PER_MILLION = float(os.getenv("GEMINI_INPUT_COST_PER_MILLION", "0.30"))
+GEMINI_OUTPUT_COST_PER_MILLION = float(os.getenv("GEMINI_OUTPUT_COST_PER_MILLION", "2.50"))
+PROFILE_HEADER = "X-Profile"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.help = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def describe(self, name, kind, text):
+        self.help[name] = (kind, text)
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (f'{k}="' + str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+                   for k, v in pairs)
+        return "{" + ",".join(escaped) + "}"
+
+    def render(self):
+        with self.lock:
+            histograms = {key: (list(h.counts), h.total, h.count) for key, h in self.histograms.items()}
+            counters = dict(self.counters)
+
+        lines = []
+        for name in sorted({key[0] for key in histograms} | {key[0] for key in counters}):
+            kind, text = self.help.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{self._labels(labels)} {value:g}")
+            for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{self._labels(labels, [('le', f'{bound:g}')])} {cumulative}")
+                lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {count}")
+                lines.append(f"{name}_sum{self._labels(labels)} {total:.6f}")
+                lines.append(f"{name}_count{self._labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.describe("app_request_duration_seconds", "histogram", "HTTP istek süresi (rota, metot ve duruma göre).")
+metrics.describe("app_stage_duration_seconds", "histogram", "İstek aşamalarının süresi (liste yükleme, prompt, Gemini, JSON, kayıt).")
+metrics.describe("app_gemini_tokens_total", "counter", "usage_metadata'dan okunan Gemini token sayıları.")
+metrics.describe("app_gemini_cost_usd_total", "counter", "Token fiyatlarından hesaplanan tahmini Gemini maliyeti (USD).")
+
+# İstek bazlı ölçüm bağlamı: rota etiketi ve profil açıksa aşama/token dökümü.
+request_metrics = contextvars.ContextVar("request_metrics", default=None)
+# İsteğin işleri havuz iş parçacıklarında da çalışabildiği için token sayaçları kilitle güncellenir.
+request_metrics_lock = threading.Lock()
+
+
+def start_request_metrics(route, profile=False):
+    context = {"route": route, "spans": [] if profile else None, "tokens": {}}
+    return context, request_metrics.set(context)
+
+
+@contextmanager
+def span(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        context = request_metrics.get()
+        metrics.observe("app_stage_duration_seconds", elapsed, stage=stage,
+                        route=context["route"] if context else "background")
+        if context and context["spans"] is not None:
+            context["spans"].append((stage, elapsed))
+
+
+def record_token_usage(response):
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return
+    context = request_metrics.get()
+    route = context["route"] if context else "background"
+    prompt_tokens = getattr(usage, 'prompt_token_count', 0) or 0
+    output_tokens = getattr(usage, 'candidates_token_count', 0) or 0
+    for kind, amount in (("prompt", prompt_tokens), ("output", output_tokens)):
+        metrics.inc("app_gemini_tokens_total", amount, route=route, type=kind)
+        if context:
+            with request_metrics_lock:
+                context["tokens"][kind] = context["tokens"].get(kind, 0) + amount
+    cost = (prompt_tokens * GEMINI_INPUT_COST_PER_MILLION + output_tokens * GEMINI_OUTPUT_COST_PER_MILLION) / 1e6
+    metrics.inc("app_gemini_cost_usd_total", cost, route=route)
+
+
+def submit_in_request_context(executor, fn, *args, **kwargs):
+    # Havuzdaki iş isteğin bağlamının kopyasında çalışır: rota etiketi korunur, span ve token'lar isteğin
+    # profiline yazılır. Her iş kendi kopyasını alır; aynı Context iki iş parçacığında birden açılamaz.
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def server_timing_header(spans):
+    totals = {}
+    for stage, elapsed in spans:
+        duration, count = totals.get(stage, (0.0, 0))
+        totals[stage] = (duration + elapsed, count + 1)
+    return ", ".join(f'{stage};dur={duration * 1000:.1f};desc="x{count}"' for stage, (duration, count) in totals.items())
 
-try:
-    with open(SYSTEM_PROMPTS_PATH, 'r', encoding='utf-8') as f:
-        prompts_data = json.load(f)
-    print("Prompt dosyası başarıyla yüklendi.")
-except Exception as e:
-    print(f"HATA: Prompt dosyası ({SYSTEM_PROMPTS_PATH}) yüklenemedi: {e}")
-    prompts_data = {}
+SYSTEM_PROMPTS_PATH = os.path.join('prompts/general_system_prompts.json')
+PROMPT_RELOAD_CHECK_SECONDS = float(os.getenv("PROMPT_RELOAD_CHECK_SECONDS", "2"))
+PROMPT_PLACEHOLDER_PATTERN = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+class PromptTemplate:
+    def __init__(self, text):
+        self.text = text
+        self.parts = []
+        position = 0
+        for match in PROMPT_PLACEHOLDER_PATTERN.finditer(text):
+            self.parts.append((text[position:match.start()], match.group(1)))
+            position = match.end()
+        self.parts.append((text[position:], None))
+
+    def render(self, **values):
+        rendered = []
+        for literal, field in self.parts:
+            rendered.append(literal)
+            if field is not None:
+                rendered.append(str(values[field]) if field in values else f"{{{field}}}")
+        return "".join(rendered)
+
+
+def render_topic_preamble(prompt):
+    if not isinstance(prompt, dict):
+        return prompt
+    role = prompt.get('role', 'İngilizce Öğretmeni.')
+    persona = prompt.get('persona', 'Destekleyici ve profesyonel.')
+    methodology = prompt.get('methodology', '')
+    task = prompt.get('task', 'Konuyla ilgili pratik yap.')
+    return f"ROLE: {role}\nPERSONA: {persona}\nMETHODOLOGY: {methodology}\nTASK: {task}"
+
+
+class PromptSnapshot:
+    def __init__(self, data, mtime, version):
+        self.data = data
+        self.mtime = mtime
+        self.version = version
+        self.templates = {key: PromptTemplate(value) for key, value in data.items() if isinstance(value, str)}
+        # Konu prompt'ları her sürüm için bir kez hazırlanır; sohbet açılışında yeniden oluşturulmaz.
+        self.preambles = {key: render_topic_preamble(value) for key, value in data.items()}
+
+
+class PromptRegistry:
+    def __init__(self, path, check_interval):
+        self.path = path
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.last_check = 0.0
+        self.snapshot = PromptSnapshot({}, None, "empty")
+        self.reload()
+
+    def reload(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw.decode('utf-8'))
+        except Exception as e:
+            print(f"HATA: Prompt dosyası ({self.path}) yüklenemedi: {e}")
+            return False
+
+        # Yeni sürüm tamamen hazırlandıktan sonra tek atamayla devreye alınır.
+        self.snapshot = PromptSnapshot(data, mtime, hashlib.sha256(raw).hexdigest()[:12])
+        print(f"Prompt dosyası başarıyla yüklendi (sürüm {self.snapshot.version}).")
+        return True
+
+    def current(self):
+        now = time.monotonic()
+        if now - self.last_check >= self.check_interval:
+            with self.lock:
+                if now - self.last_check >= self.check_interval:
+                    self.last_check = now
+                    try:
+                        mtime = os.path.getmtime(self.path)
+                    except OSError:
+                        mtime = self.snapshot.mtime
+                    if mtime != self.snapshot.mtime:
+                        self.reload()
+
+        snapshot = self.snapshot
+        if has_request_context():
+            g.prompt_version = snapshot.version
+        return snapshot
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    def get(self, key, default=None):
+        return self.current().data.get(key, default)
+
+    def topic_preamble(self, topic_id):
+        snapshot = self.current()
+        return snapshot.version, snapshot.preambles.get(topic_id)
+
+    def render(self, key, **values):
+        with span("prompt_render"):
+            template = self.current().templates.get(key)
+            if template is None:
+                return None
+            return template.render(**values)
+
+
+prompt_registry = PromptRegistry(SYSTEM_PROMPTS_PATH, PROMPT_RELOAD_CHECK_SECONDS)
 
 LISTS_DIR = 'lists/user_lists'
 MAIN_LISTS_DIR = 'lists/main_lists'
+MAIN_LISTS_SNAPSHOT_PATH = os.getenv("MAIN_LISTS_SNAPSHOT_PATH", 'lists/main_lists.snapshot')
+LIST_FLUSH_INTERVAL_SECONDS = float(os.getenv("LIST_FLUSH_INTERVAL_SECONDS", "1"))
+LIST_STAT_INTERVAL_SECONDS = float(os.getenv("LIST_STAT_INTERVAL_SECONDS", "1"))
+LIST_DATABASE_PATH = os.getenv("LIST_DATABASE_PATH", 'lists/collections.sqlite3')
+ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "123456")
+USERNAME_PATTERN = re.compile(r"[A-Za-z0-9_-]{3,32}")
+# Giriş yapılmamış isteklerin ad alanı; USERNAME_PATTERN'e uymadığı için hiçbir hesapla çakışmaz ve
+# veritabanında kullanıcısı olmadığından boştur (yalnızca hazır listeler görünür).
+ANONYMOUS_LIST_OWNER = "~anonim"
+MIN_PASSWORD_LENGTH = 6
+
+QUIZ_MAX_WORKERS = int(os.getenv("QUIZ_MAX_WORKERS", "5"))
+QUIZ_DEADLINE_SECONDS = float(os.getenv("QUIZ_DEADLINE_SECONDS", "30"))
+
+quiz_executor = ThreadPoolExecutor(max_workers=QUIZ_MAX_WORKERS, thread_name_prefix="quiz")
+REQUIRED_QUESTION_KEYS = ['question_sentence', 'correct_answer', 'distractor1', 'distractor2']
+QUIZ_DEFAULT_QUESTIONS = int(os.getenv("QUIZ_DEFAULT_QUESTIONS", "10"))
+QUIZ_MAX_QUESTIONS = int(os.getenv("QUIZ_MAX_QUESTIONS", "50"))
+QUIZ_BATCH_SIZE = int(os.getenv("QUIZ_BATCH_SIZE", "10"))
+DISTRACTOR_INDEX_CACHE_ITEMS = int(os.getenv("DISTRACTOR_INDEX_CACHE_ITEMS", "64"))
+
+QUESTION_BANK_DIR = 'question_bank'
+SRS_DIR = 'srs_data'
+SRS_NEW_WORD_RATIO = float(os.getenv("SRS_NEW_WORD_RATIO", "0.3"))
+SRS_HEAP_CACHE_ITEMS = int(os.getenv("SRS_HEAP_CACHE_ITEMS", "2000"))
+SRS_MAX_REVIEWS_PER_SUBMIT = int(os.getenv("SRS_MAX_REVIEWS_PER_SUBMIT", "200"))
+QUESTION_BANK_VARIANTS = int(os.getenv("QUESTION_BANK_VARIANTS", "3"))
+QUESTION_BANK_WORKERS = int(os.getenv("QUESTION_BANK_WORKERS", "1"))
+QUESTION_BANK_QUEUE_SIZE = int(os.getenv("QUESTION_BANK_QUEUE_SIZE", "5000"))
+QUESTION_BANK_MIN_FREE_REQUESTS = float(os.getenv("QUESTION_BANK_MIN_FREE_REQUESTS", "5"))
+QUESTION_BANK_WARM_LISTS = [n.strip() for n in os.getenv("QUESTION_BANK_WARM_LISTS", "").split(",") if n.strip()]
+QUESTION_BANK_WARM_LEVELS = [n.strip() for n in os.getenv("QUESTION_BANK_WARM_LEVELS", "B1").split(",") if n.strip()]
+
+BULK_TRANSLATE_BATCH_SIZE = int(os.getenv("BULK_TRANSLATE_BATCH_SIZE", "40"))
+BULK_IMPORT_MAX_WORDS = int(os.getenv("BULK_IMPORT_MAX_WORDS", "1000"))
+BULK_IMPORT_PROGRESS_ITEMS = 100
+BULK_IMPORT_PROGRESS_TTL_SECONDS = float(os.getenv("BULK_IMPORT_PROGRESS_TTL_SECONDS", "600"))
+
+bulk_import_progress = OrderedDict()
+bulk_import_lock = threading.Lock()
+
+GENERATOR_JSON_CONFIG = {"response_mime_type": "application/json"}
+generator_stats = {"generated": 0, "passed_locally": 0, "ensure_english_fallbacks": 0}
+generator_stats_lock = threading.Lock()
+
+COLLECTION_PAGE_DEFAULT_LIMIT = int(os.getenv("COLLECTION_PAGE_DEFAULT_LIMIT", "100"))
+COLLECTION_PAGE_MAX_LIMIT = int(os.getenv("COLLECTION_PAGE_MAX_LIMIT", "1000"))
+COLLECTION_WORD_FIELDS = {"original": 0, "translation": 1}
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+
+class ResponseCache:
+    def __init__(self, directory, ttl_seconds, memory_items, disk_items):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.memory_items = memory_items
+        self.disk_items = disk_items
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()
+        self.disk_index = OrderedDict()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+        self._scan_disk()
+
+    @staticmethod
+    def make_key(model_name, prompt_key, final_prompt):
+        digest = hashlib.sha256()
+        for part in (model_name, prompt_key, final_prompt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _scan_disk(self):
+        entries = []
+        if os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for filename in files:
+                    if filename.endswith('.json'):
+                        path = os.path.join(root, filename)
+                        try:
+                            entries.append((os.path.getmtime(path), filename[:-5]))
+                        except OSError:
+                            pass
+        for mtime, key in sorted(entries):
+            self.disk_index[key] = mtime
+
+    def _remember(self, key, created_at, text):
+        self.memory[key] = (created_at, text)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def _unlink(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def get(self, key):
+        # Kilit yalnızca bellek içi yapılar için tutulur; disk okuması ve silme kilit dışında yapılır.
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_seconds:
+                    self.memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return entry[1]
+                del self.memory[key]
+            stamp = self.disk_index.get(key)
+            if stamp is None:
+                if entry is not None:
+                    self.counters["expired"] += 1
+                self.counters["misses"] += 1
+                return None
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = None
+
+        with self.lock:
+            if stored is not None and now - stored.get("created_at", 0) <= self.ttl_seconds:
+                self._remember(key, stored["created_at"], stored["text"])
+                self.counters["disk_hits"] += 1
+                return stored["text"]
+            self.counters["expired"] += 1
+            self.counters["misses"] += 1
+            # Bu arada aynı anahtar yeniden yazıldıysa yeni kayıt silinmez.
+            stale = self.disk_index.get(key) == stamp
+            if stale:
+                del self.disk_index[key]
+        if stale:
+            self._unlink(key)
+        return None
+
+    def set(self, key, text, prompt_key=""):
+        now = time.time()
+        path = self._path(key)
+        with self.lock:
+            self._remember(key, now, text)
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"created_at": now, "prompt_key": prompt_key, "text": text}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Gemini önbelleği diske yazılamadı: {e}")
+            return
+
+        evicted = []
+        with self.lock:
+            self.disk_index.pop(key, None)
+            self.disk_index[key] = now
+            self.counters["stores"] += 1
+            while len(self.disk_index) > self.disk_items:
+                oldest_key, _ = self.disk_index.popitem(last=False)
+                self.memory.pop(oldest_key, None)
+                evicted.append(oldest_key)
+                self.counters["evictions"] += 1
+        for oldest_key in evicted:
+            self._unlink(oldest_key)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            return dict(self.counters,
+                        memory_entries=len(self.memory),
+                        disk_entries=len(self.disk_index),
+                        hit_rate=round(hits / lookups, 4) if lookups else 0.0)
+
+
+response_cache = ResponseCache(GEMINI_CACHE_DIR, GEMINI_CACHE_TTL_SECONDS,
+                               GEMINI_CACHE_MEMORY_ITEMS, GEMINI_CACHE_DISK_ITEMS)
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = max(per_minute, 1.0)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount):
+        # Bakiye eksiye düşebilir; borç kapanana kadar geçecek süre bekleme süresidir.
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.lock = threading.Lock()
+        self.blocked_until = 0.0
+        self.counters = {"calls": 0, "waits": 0, "wait_seconds": 0.0, "retries": 0, "retry_hints": 0,
+                         "quota_errors": 0, "transient_errors": 0, "gave_up": 0, "stream_failures": 0}
+
+    def reserve(self, estimated_tokens):
+        now = time.monotonic()
+        with self.lock:
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            wait_seconds = max(self.requests.take(1), self.tokens.take(estimated_tokens),
+                               self.blocked_until - now, 0.0)
+            self.counters["calls"] += 1
+            if wait_seconds > 0:
+                self.counters["waits"] += 1
+                self.counters["wait_seconds"] += wait_seconds
+            return wait_seconds
+
+    def acquire(self, estimated_tokens):
+        wait_seconds = self.reserve(estimated_tokens)
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    def settle(self, estimated_tokens, actual_tokens):
+        with self.lock:
+            self.tokens.tokens += estimated_tokens - actual_tokens
+
+    def has_headroom(self, requests):
+        with self.lock:
+            self.requests.refill(time.monotonic())
+            return self.requests.tokens >= requests and self.blocked_until <= time.monotonic()
+
+    def block_for(self, seconds):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def count(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] += amount
+
+    def stats(self):
+        now = time.monotonic()
+        with self.lock:
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return dict(self.counters,
+                        wait_seconds=round(self.counters["wait_seconds"], 3),
+                        requests_per_minute=self.requests.capacity,
+                        tokens_per_minute=self.tokens.capacity,
+                        available_requests=round(self.requests.tokens, 2),
+                        available_tokens=round(self.tokens.tokens),
+                        blocked_for_seconds=round(max(0.0, self.blocked_until - now), 3))
+
+
+gemini_limiter = RateLimiter(GEMINI_REQUESTS_PER_MINUTE, GEMINI_TOKENS_PER_MINUTE)
+
+
+class InFlightCall:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # Aynı anahtarla eşzamanlı gelen çağrılar tek bir upstream çağrısını paylaşır.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.async_calls = {}
+        self.counters = {"leaders": 0, "shared": 0, "errors": 0}
+
+    def _join(self, key, calls, create):
+        with self.lock:
+            call = calls.get(key)
+            if call is None:
+                call = calls[key] = create()
+                self.counters["leaders"] += 1
+                return call, True
+            self.counters["shared"] += 1
+            return call, False
+
+    def _leave(self, key, calls, failed):
+        with self.lock:
+            del calls[key]
+            if failed:
+                self.counters["errors"] += 1
+
+    def do(self, key, fn):
+        call, leader = self._join(key, self.calls, InFlightCall)
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            self._leave(key, self.calls, call.error is not None)
+            call.event.set()
+        return call.result, False
+
+    async def do_async(self, key, fn):
+        # Paylaşılan çağrı ayrı bir görevde çalışır; liderin isteği iptal edilse de bekleyenler sonucu alır.
+        task, leader = self._join(key, self.async_calls, lambda: asyncio.ensure_future(fn()))
+        if leader:
+            task.add_done_callback(lambda done: self._leave(
+                key, self.async_calls, done.cancelled() or done.exception() is not None))
+        return await asyncio.shield(task), not leader
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, in_flight=len(self.calls) + len(self.async_calls))
+
+
+gemini_single_flight = SingleFlight()
+
+GEMINI_QUOTA_EXCEPTIONS = (exceptions.ResourceExhausted, exceptions.TooManyRequests)
+GEMINI_TRANSIENT_EXCEPTIONS = (exceptions.ServiceUnavailable, exceptions.DeadlineExceeded,
+                               exceptions.InternalServerError, exceptions.BadGateway)
+RETRY_DELAY_PATTERNS = (re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)"),
+                        re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE))
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def retry_after_seconds(error):
+    for detail in getattr(error, 'details', None) or []:
+        retry_delay = getattr(detail, 'retry_delay', None)
+        if retry_delay is not None and getattr(retry_delay, 'seconds', None) is not None:
+            return retry_delay.seconds + getattr(retry_delay, 'nanos', 0) / 1e9
+
+    http_response = getattr(error, 'response', None)
+    headers = getattr(http_response, 'headers', None) or {}
+    if headers.get('Retry-After'):
+        try:
+            return float(headers['Retry-After'])
+        except ValueError:
+            pass
+
+    for pattern in RETRY_DELAY_PATTERNS:
+        match = pattern.search(str(error))
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def response_token_count(response):
+    usage = getattr(response, 'usage_metadata', None)
+    return getattr(usage, 'total_token_count', None) if usage is not None else None
+
+
+def gemini_retry_delay(error, attempt):
+    is_quota_error = isinstance(error, GEMINI_QUOTA_EXCEPTIONS)
+    gemini_limiter.count("quota_errors" if is_quota_error else "transient_errors")
+
+    hint = retry_after_seconds(error)
+    if hint is not None:
+        gemini_limiter.count("retry_hints")
+        delay = hint
+    else:
+        delay = random.uniform(0, min(GEMINI_BACKOFF_MAX_SECONDS, GEMINI_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    if attempt == GEMINI_MAX_RETRIES or delay > GEMINI_MAX_RETRY_WAIT_SECONDS:
+        gemini_limiter.count("gave_up")
+        raise error
+
+    print(f"Gemini geçici hatası ({type(error).__name__}), {delay:.1f} sn sonra yeniden denenecek: {error}")
+    gemini_limiter.count("retries")
+    # Kota hatasında bekleme limiter üzerinden yapılır; sonraki rezervasyon engeli görür.
+    if is_quota_error:
+        gemini_limiter.block_for(delay)
+        return 0.0
+    return delay
+
+
+def settle_token_usage(response, estimated_tokens):
+    record_token_usage(response)
+    actual_tokens = response_token_count(response)
+    if actual_tokens is not None:
+        gemini_limiter.settle(estimated_tokens, actual_tokens)
+
+
+def call_gemini(operation, prompt_text="", stream=False):
+    estimated_tokens = estimate_tokens(prompt_text)
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        gemini_limiter.acquire(estimated_tokens)
+        try:
+            with span("gemini_call"):
+                response = operation()
+        except GEMINI_QUOTA_EXCEPTIONS + GEMINI_TRANSIENT_EXCEPTIONS as e:
+            time.sleep(gemini_retry_delay(e, attempt))
+            continue
+
+        # Akışta kullanım bilgisi yanıt tüketildikten sonra dolar; orada kaydedilir.
+        if not stream:
+            settle_token_usage(response, estimated_tokens)
+        return response
+
+
+async def call_gemini_async(operation, prompt_text="", stream=False):
+    estimated_tokens = estimate_tokens(prompt_text)
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        wait_seconds = gemini_limiter.reserve(estimated_tokens)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+        try:
+            with span("gemini_call"):
+                response = await operation()
+        except GEMINI_QUOTA_EXCEPTIONS + GEMINI_TRANSIENT_EXCEPTIONS as e:
+            await asyncio.sleep(gemini_retry_delay(e, attempt))
+            continue
+
+        # Akışta kullanım bilgisi yanıt tüketildikten sonra dolar; orada kaydedilir.
+        if not stream:
+            settle_token_usage(response, estimated_tokens)
+        return response
+
+
+def gemini_generate_with_source(prompt_key, final_prompt, use_cache=True, generation_config=None):
+    if not use_cache:
+        response = call_gemini(lambda: model.generate_content(final_prompt, generation_config=generation_config),
+                               final_prompt)
+        return response.text, "model"
+
+    cache_key = ResponseCache.make_key(model.name, prompt_key, final_prompt)
+    cached_text = response_cache.get(cache_key)
+    if cached_text is not None:
+        return cached_text, "cache"
+
+    def fetch():
+        # Önceki lider bu arada bitirmiş olabilir; tekrar çağrı yapmadan önce önbelleğe bakılır.
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached, "cache"
+        response = call_gemini(lambda: model.generate_content(final_prompt, generation_config=generation_config),
+                               final_prompt)
+        text = response.text
+        if text and text.strip():
+            response_cache.set(cache_key, text, prompt_key)
+        return text, "model"
+
+    (text, source), shared = gemini_single_flight.do(cache_key, fetch)
+    return text, "shared" if shared else source
+
+
+def gemini_generate(prompt_key, final_prompt, use_cache=True):
+    text, _ = gemini_generate_with_source(prompt_key, final_prompt, use_cache=use_cache)
+    return text
+
+
+async def gemini_generate_with_source_async(prompt_key, final_prompt, use_cache=True, generation_config=None):
+    cache_key = ResponseCache.make_key(model.name, prompt_key, final_prompt)
+    if not use_cache:
+        response = await call_gemini_async(
+            lambda: model.generate_content_async(final_prompt, generation_config=generation_config), final_prompt)
+        return response.text, "model"
+
+    # Önbellek disk okuması/yazması olay döngüsünü bloklamasın diye iş parçacığında yapılır.
+    cached_text = await asyncio.to_thread(response_cache.get, cache_key)
+    if cached_text is not None:
+        return cached_text, "cache"
+
+    async def fetch():
+        cached = await asyncio.to_thread(response_cache.get, cache_key)
+        if cached is not None:
+            return cached, "cache"
+        response = await call_gemini_async(
+            lambda: model.generate_content_async(final_prompt, generation_config=generation_config), final_prompt)
+        text = response.text
+        if text and text.strip():
+            await asyncio.to_thread(response_cache.set, cache_key, text, prompt_key)
+        return text, "model"
+
+    (text, source), shared = await gemini_single_flight.do_async(cache_key, fetch)
+    return text, "shared" if shared else source
+
+
+def iter_response_text(response, prompt_text=""):
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            continue
+        if text:
+            yield text
+    settle_token_usage(response, estimate_tokens(prompt_text))
+
+
+async def aiter_response_text(response, prompt_text=""):
+    async for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            continue
+        if text:
+            yield text
+    settle_token_usage(response, estimate_tokens(prompt_text))
+
+
+def report_stream_failure(error):
+    # Parça gönderildikten sonra akış yeniden denenemez; hata yine de limiter'a işlenir ki geri çekilme uygulansın.
+    is_quota_error = isinstance(error, GEMINI_QUOTA_EXCEPTIONS)
+    gemini_limiter.count("quota_errors" if is_quota_error else "transient_errors")
+    gemini_limiter.count("stream_failures")
+    if is_quota_error:
+        hint = retry_after_seconds(error)
+        gemini_limiter.block_for(hint if hint is not None else GEMINI_BACKOFF_BASE_SECONDS)
+
+
+def stream_gemini_text(operation, prompt_text="", reset=None):
+    # Henüz parça gönderilmediyse akış baştan açılır; sonrasında hata limiter'a bildirilip yukarı iletilir.
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        response = call_gemini(operation, prompt_text, stream=True)
+        started = False
+        try:
+            for text in iter_response_text(response, prompt_text):
+                started = True
+                yield text
+            return
+        except GEMINI_QUOTA_EXCEPTIONS + GEMINI_TRANSIENT_EXCEPTIONS as e:
+            if started:
+                report_stream_failure(e)
+                raise
+            time.sleep(gemini_retry_delay(e, attempt))
+            if reset:
+                reset()
+
+
+async def astream_gemini_text(operation, prompt_text=""):
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        response = await call_gemini_async(operation, prompt_text, stream=True)
+        started = False
+        try:
+            async for text in aiter_response_text(response, prompt_text):
+                started = True
+                yield text
+            return
+        except GEMINI_QUOTA_EXCEPTIONS + GEMINI_TRANSIENT_EXCEPTIONS as e:
+            if started:
+                report_stream_failure(e)
+                raise
+            await asyncio.sleep(gemini_retry_delay(e, attempt))
+
+
+def gemini_stream(prompt_key, final_prompt, use_cache=True):
+    cache_key = ResponseCache.make_key(model.name, prompt_key, final_prompt)
+    if use_cache:
+        cached_text = response_cache.get(cache_key)
+        if cached_text is not None:
+            return iter([cached_text])
+
+    def pieces():
+        collected = []
+        for text in stream_gemini_text(lambda: model.generate_content(final_prompt, stream=True), final_prompt):
+            collected.append(text)
+            yield text
+        if use_cache and "".join(collected).strip():
+            response_cache.set(cache_key, "".join(collected), prompt_key)
+
+    return pieces()
+
+
+async def gemini_stream_async(prompt_key, final_prompt, use_cache=True):
+    cache_key = ResponseCache.make_key(model.name, prompt_key, final_prompt)
+    if use_cache:
+        cached_text = await asyncio.to_thread(response_cache.get, cache_key)
+        if cached_text is not None:
+            async def cached_pieces():
+                yield cached_text
+            return cached_pieces()
+
+    async def pieces():
+        collected = []
+        async for text in astream_gemini_text(lambda: model.generate_content_async(final_prompt, stream=True),
+                                              final_prompt):
+            collected.append(text)
+            yield text
+        if use_cache and "".join(collected).strip():
+            await asyncio.to_thread(response_cache.set, cache_key, "".join(collected), prompt_key)
+
+    return pieces()
+
+
+def list_object_translate_with_source(prompt_content):
+    prompt_for_translation = prompt_registry.render("translate_prompt", prompt_text=prompt_content)
+    if prompt_for_translation is None:
+        raise KeyError("'translate_prompt' anahtarı JSON'da bulunamadı.")
+
+    text, source = gemini_generate_with_source("translate_prompt", prompt_for_translation)
+    return text.strip(), source
 
 
 def list_object_translate(prompt_content):
-    with open(SYSTEM_PROMPTS_PATH, 'r', encoding='utf-8') as dosya:
-        prompt_data = json.load(dosya)
+    translation, _ = list_object_translate_with_source(prompt_content)
+    return translation
 
-    prompt_sablonu = prompt_data.get("translate_prompt")
 
-    prompt_for_translation = prompt_sablonu.replace("{prompt_text}", prompt_content)
+async def list_object_translate_with_source_async(prompt_content):
+    prompt_for_translation = prompt_registry.render("translate_prompt", prompt_text=prompt_content)
+    if prompt_for_translation is None:
+        raise KeyError("'translate_prompt' anahtarı JSON'da bulunamadı.")
 
-    response = model.generate_content(prompt_for_translation)
-    time.sleep(2)
-    return response.text.strip()
+    text, source = await gemini_generate_with_source_async("translate_prompt", prompt_for_translation)
+    return text.strip(), source
+
+
+def parse_json_response(response_text):
+    with span("json_parse"):
+        cleaned_response_text = response_text.strip().replace('```json', '').replace('```', '')
+        return json.loads(cleaned_response_text)
+
+
+def is_failed_translation(translation):
+    lowered = translation.lower()
+    return not translation.strip() or "hata oluştu" in lowered or "içerik anlaşılmadı" in lowered \
+        or "içerik anlaşılamadı" in lowered
+
+
+def batch_translate(words, progress_callback=None):
+    if prompt_registry.get("batch_translate_prompt") is None:
+        raise KeyError("'batch_translate_prompt' anahtarı JSON'da bulunamadı.")
+
+    translations = {}
+    failures = {}
+    # Listelerde zaten bulunan kelimeler modele gönderilmez.
+    unknown_words = []
+    for word in words:
+        translation = translation_resolver.resolve_local(word, current_list_owner())
+        if translation is None:
+            unknown_words.append(word)
+        else:
+            translations[word] = translation
+    words = unknown_words
+    batches = [words[i:i + BULK_TRANSLATE_BATCH_SIZE] for i in range(0, len(words), BULK_TRANSLATE_BATCH_SIZE)]
+
+    for batch_index, batch in enumerate(batches, start=1):
+        final_prompt = prompt_registry.render("batch_translate_prompt",
+                                              words_json=json.dumps(batch, ensure_ascii=False))
+        try:
+            response_text, served_by = gemini_generate_with_source("batch_translate_prompt", final_prompt)
+            translation_resolver.count(served_by, len(batch))
+            result = parse_json_response(response_text)
+            if not isinstance(result, dict):
+                raise ValueError("Yanıt bir JSON objesi değil.")
+        except Exception as e:
+            print(f"Toplu çeviri hatası ({batch_index}/{len(batches)}. grup): {e}")
+            for word in batch:
+                failures[word] = f"Grup çevrilemedi: {e}"
+        else:
+            lowered_result = {str(k).strip().lower(): v for k, v in result.items()}
+            for word in batch:
+                translation = result.get(word, lowered_result.get(word.lower()))
+                if not isinstance(translation, str) or is_failed_translation(translation):
+                    failures[word] = "Kelime çevrilemedi veya anlaşılamadı."
+                else:
+                    translations[word] = translation.strip()
+
+        if progress_callback:
+            progress_callback(batch_index, len(batches), len(translations), len(failures))
+
+    return translations, failures
+
+
+def prune_bulk_import_progress(now):
+    # Biten aktarmalar TTL sonunda silinir; süren aktarmalar yalnızca boyut sınırıyla atılır.
+    for key, progress in list(bulk_import_progress.items()):
+        if progress.get("status") in ("done", "error") \
+                and now - progress["updated_at"] > BULK_IMPORT_PROGRESS_TTL_SECONDS:
+            del bulk_import_progress[key]
+    while len(bulk_import_progress) > BULK_IMPORT_PROGRESS_ITEMS:
+        bulk_import_progress.popitem(last=False)
+
+
+def update_bulk_import_progress(owner, import_id, **fields):
+    # İlerleme sahibine göre tutulur; başka kullanıcılar aynı kimliği sorgulasa da göremez.
+    key = (owner, import_id)
+    with bulk_import_lock:
+        now = time.time()
+        progress = bulk_import_progress.setdefault(key, {})
+        progress.update(fields, updated_at=now)
+        bulk_import_progress.move_to_end(key)
+        prune_bulk_import_progress(now)
+        return dict(progress)
+
+
+def get_bulk_import_progress(owner, import_id):
+    with bulk_import_lock:
+        prune_bulk_import_progress(time.time())
+        progress = bulk_import_progress.get((owner, import_id))
+        return dict(progress) if progress else None
 
 
 def generate_question(prompt_icerik, konu, level='B1'):
     print(f"--- 'generate_question' fonksiyonu '{prompt_icerik}' için çalıştırıldı. ---")
-    promptpath = "prompts/general_system_prompts.json"
 
     try:
-        with open(promptpath, 'r', encoding='utf-8') as dosya:
-            prompts_data = json.load(dosya)
-
-        prompt_sablonu = prompts_data.get("quiz_sentence_completion_prompt")
-        if not prompt_sablonu:
+        final_prompt = prompt_registry.render("quiz_sentence_completion_prompt",
+                                              konu=konu, level=level, prompt_text=prompt_icerik)
+        if not final_prompt:
             print("HATA: 'quiz_sentence_completion_prompt' anahtarı JSON'da bulunamadı!")
             return {"error": "'quiz_sentence_completion_prompt' JSON'da bulunamadı."}
 
-        final_prompt = prompt_sablonu.replace("{konu}", konu) \
-            .replace("{level}", level) \
-            .replace("{prompt_text}", prompt_icerik)
-
         print("--> Gemini'ye gönderilecek prompt hazırlandı. API çağrısı yapılıyor...")
-        response = model.generate_content(final_prompt)
-        time.sleep(1)
+        response_text = gemini_generate("quiz_sentence_completion_prompt", final_prompt, use_cache=False)
 
-        print(f"--> Gemini'den gelen ham yanıt alindi: {response.text[:100]}...")
-        cleaned_response_text = response.text.strip().replace('```json', '').replace('```', '')
-
-        parsed_json = json.loads(cleaned_response_text)
+        print(f"--> Gemini'den gelen ham yanıt alindi: {response_text[:100]}...")
+        parsed_json = parse_json_response(response_text)
         print("--> Gemini yanıtı başarıyla JSON olarak ayrıştırıldı.")
         return parsed_json
 
@@ -78,88 +1220,1180 @@ def generate_question(prompt_icerik, konu, level='B1'):
         return {"error": f"generate_question içinde beklenmedik hata: {str(e)}"}
 
 
-def is_likely_english(text):
+TURKISH_ONLY_CHARACTERS = frozenset("ğĞşŞıİ")
+TURKISH_STOPWORDS = frozenset({"ve", "bir", "bu", "şu", "için", "ile", "çok", "ama", "gibi", "daha", "değil",
+                               "olarak", "olan", "ben", "sen", "biz", "siz", "onlar", "var", "yok", "mi", "mı",
+                               "ne", "da", "de", "ki", "çünkü", "sonra", "şimdi", "evet", "hayır", "merhaba"})
+ENGLISH_STOPWORDS = frozenset({"the", "and", "is", "are", "a", "an", "to", "of", "in", "it", "you", "i", "that",
+                               "this", "was", "with", "for", "on", "be", "have", "do", "not", "my", "your"})
+FOREIGN_LETTER_RATIO = 0.05
+
+
+def generate_question_batch(words, konu, level='B1'):
+    print(f"--- 'generate_question_batch' {len(words)} kelime için çalıştırıldı. ---")
+
+    final_prompt = prompt_registry.render("quiz_sentence_completion_batch_prompt", konu=konu, level=level,
+                                          words_json=json.dumps(words, ensure_ascii=False))
+    if not final_prompt:
+        print("HATA: 'quiz_sentence_completion_batch_prompt' anahtarı JSON'da bulunamadı!")
+        return {word: {"error": "'quiz_sentence_completion_batch_prompt' JSON'da bulunamadı."} for word in words}
+
     try:
-        return all(ord(c) < 128 for c in text)
-    except TypeError:
+        parsed = parse_json_response(gemini_generate("quiz_sentence_completion_batch_prompt", final_prompt,
+                                                     use_cache=False))
+    except Exception as e:
+        print(f"!!! 'generate_question_batch' İÇİNDE HATA: {e} !!!")
+        return {word: {"error": f"Toplu soru üretimi başarısız: {str(e)}"} for word in words}
+
+    items = parsed if isinstance(parsed, list) else []
+    by_word = {}
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get("word"), str):
+            by_word.setdefault(item["word"].strip().lower(), item)
+
+    results = {}
+    for position, word in enumerate(words):
+        item = by_word.get(word.strip().lower())
+        # Model "word" alanını atladıysa ve dizi boyu tutuyorsa sıraya güvenilir.
+        if item is None and len(items) == len(words):
+            item = items[position]
+        if is_valid_question(item):
+            results[word] = item
+        else:
+            results[word] = {"error": f"'{word}' için toplu yanıtta geçerli soru bulunamadı."}
+    return results
+
+
+def is_likely_english(text):
+    if not isinstance(text, str):
+        return False
+
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return True
+    # ğ, ş ve noktasız ı İngilizcede hiç geçmez; diğer ASCII dışı harflere (café, naïve) küçük bir pay tanınır.
+    if any(c in TURKISH_ONLY_CHARACTERS for c in letters):
         return False
+    if sum(1 for c in letters if ord(c) >= 128) > FOREIGN_LETTER_RATIO * len(letters):
+        return False
+
+    words = re.findall(r"[^\W\d_]+", text.lower())
+    turkish_count = sum(1 for w in words if w in TURKISH_STOPWORDS)
+    english_count = sum(1 for w in words if w in ENGLISH_STOPWORDS)
+    return not (len(words) >= 4 and turkish_count > english_count and turkish_count >= 0.1 * len(words))
+
+
+class ListEntry:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.data = None
+        self.mtime = None
+        self.checked_at = 0.0
+        self.dirty = False
+        # Diske yazılmamış ilk değişikliğin zamanı (monotonic); istatistiklerde kirli yaş olarak görünür.
+        self.dirty_since = None
+        self.deleted = False
+        self.version = 0
+
+
+class ListStore:
+    def __init__(self, flush_interval, stat_interval):
+        self.flush_interval = flush_interval
+        self.stat_interval = stat_interval
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.listeners = []
+        self.compact_directories = set()
+        self.snapshots = {}
+        # database_root altındaki <kullanıcı>/<liste> yolları dosya değil, veritabanı satırlarıdır.
+        self.database = None
+        self.database_root = None
+        self.flush_errors = 0
+        self.last_flush_error = None
+        self.flusher = threading.Thread(target=self._flush_loop, name="list-store-flusher", daemon=True)
+        self.flusher.start()
+
+    @staticmethod
+    def path_for(list_name, directory):
+        return os.path.normpath(os.path.join(directory, f"{list_name}.json"))
+
+    def _entry(self, list_name, directory):
+        path = self.path_for(list_name, directory)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is None:
+                entry = self.entries[path] = ListEntry(path)
+            return entry
+
+    def _database_key(self, entry):
+        if self.database is None:
+            return None
+        directory, file_name = os.path.split(entry.path)
+        root, owner = os.path.split(directory)
+        return (owner, file_name[:-5]) if root == self.database_root else None
+
+    def _refresh_from_database(self, entry, key):
+        # Veritabanı listelerinde mtime yerine koleksiyonun sürümü (kimlik, revizyon) karşılaştırılır.
+        now = time.monotonic()
+        if entry.data is not None and now - entry.checked_at < self.stat_interval:
+            return
+        entry.checked_at = now
+        revision = self.database.revision(*key)
+        if entry.data is not None and revision == entry.mtime:
+            return
+        with span("list_load"):
+            entry.data = self.database.words(*key) if revision is not None else {}
+        entry.mtime = revision
+        entry.version += 1
+        self._notify("changed", entry)
+
+    def _refresh(self, entry):
+        key = self._database_key(entry)
+        if key is not None:
+            return self._refresh_from_database(entry, key)
+        # Kirli liste diskteki sürümden yenidir; yalnızca temiz listeler mtime'a göre yeniden okunur.
+        if entry.dirty:
+            return
+        now = time.monotonic()
+        if entry.data is not None and now - entry.checked_at < self.stat_interval:
+            return
+        entry.checked_at = now
+        try:
+            mtime = os.path.getmtime(entry.path)
+        except OSError:
+            changed = bool(entry.data) or entry.mtime is not None
+            entry.data, entry.mtime = {}, None
+            if changed:
+                entry.version += 1
+                self._notify("changed", entry)
+            return
+        if entry.data is None or mtime != entry.mtime:
+            with span("list_load"):
+                entry.data = self._snapshot_view(entry, mtime)
+                if entry.data is None:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        entry.data = json.load(f)
+            entry.mtime = mtime
+            entry.version += 1
+            self._notify("changed", entry)
+
+    def _snapshot_view(self, entry, mtime):
+        # JSON dosyası anlık görüntüden sonra değiştiyse görünüm kullanılmaz, liste JSON'dan okunur.
+        snapshot = self.snapshots.get(os.path.dirname(entry.path))
+        if snapshot is None:
+            return None
+        return snapshot.view(os.path.basename(entry.path)[:-5], mtime)
+
+    def _notify(self, event, entry):
+        for listener in self.listeners:
+            try:
+                listener(event, entry)
+            except Exception as e:
+                print(f"Liste dinleyicisi hatası ({event}, {entry.path}): {e}")
+
+    def view(self, list_name, directory):
+        entry = self._entry(list_name, directory)
+        with entry.lock:
+            self._refresh(entry)
+            return MappingProxyType(entry.data)
+
+    def snapshot(self, list_name, directory):
+        entry = self._entry(list_name, directory)
+        with entry.lock:
+            self._refresh(entry)
+            return (entry.path, entry.version), MappingProxyType(entry.data)
+
+    def load(self, list_name, directory):
+        entry = self._entry(list_name, directory)
+        with entry.lock:
+            self._refresh(entry)
+            return dict(entry.data)
+
+    def update(self, list_name, mutate, directory):
+        entry = self._entry(list_name, directory)
+        with entry.lock:
+            self._refresh(entry)
+            data = dict(entry.data)
+            result = mutate(data)
+            key = self._database_key(entry)
+            if key is not None:
+                # Dosya yeniden yazılmaz; yalnızca değişen satırlar tek işlemde veritabanına yazılır.
+                previous = entry.data
+                upserts = {k: v for k, v in data.items() if k not in previous or previous[k] != v}
+                removed = [k for k in previous if k not in data]
+                with span("list_save"):
+                    entry.mtime = self.database.apply_changes(*key, upserts, removed)
+                entry.data = data
+                entry.checked_at = time.monotonic()
+                entry.version += 1
+                self._notify("changed", entry)
+                return result
+            entry.data = data
+            self._mark_dirty(entry)
+            entry.version += 1
+            self._notify("changed", entry)
+            return result
+
+    def save(self, list_name, data, directory):
+        entry = self._entry(list_name, directory)
+        with entry.lock:
+            key = self._database_key(entry)
+            if key is not None:
+                with span("list_save"):
+                    entry.mtime = self.database.replace_words(*key, data)
+                entry.data = dict(data)
+                entry.checked_at = time.monotonic()
+                entry.version += 1
+                self._notify("changed", entry)
+                return
+            entry.data = dict(data)
+            self._mark_dirty(entry)
+            entry.version += 1
+            self._notify("changed", entry)
+
+    @staticmethod
+    def _mark_dirty(entry):
+        if not entry.dirty:
+            entry.dirty_since = time.monotonic()
+        entry.dirty = True
+        entry.deleted = False
+
+    def _write(self, entry):
+        if not entry.dirty or entry.deleted:
+            return
+        os.makedirs(os.path.dirname(entry.path) or '.', exist_ok=True)
+        tmp_path = f"{entry.path}.tmp"
+        with span("list_save"):
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    if os.path.dirname(entry.path) in self.compact_directories:
+                        json.dump(entry.data, f, ensure_ascii=False, separators=(',', ':'))
+                    else:
+                        json.dump(entry.data, f, indent=4)
+                os.replace(tmp_path, entry.path)
+            except BaseException:
+                # Yarım kalan geçici dosya bırakılmaz.
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        entry.mtime = os.path.getmtime(entry.path)
+        entry.checked_at = time.monotonic()
+        entry.dirty = False
+        entry.dirty_since = None
+        self._notify("flushed", entry)
+
+    def flush_list(self, list_name, directory):
+        entry = self._entry(list_name, directory)
+        with entry.lock:
+            self._write(entry)
+
+    def flush(self):
+        with self.lock:
+            entries = list(self.entries.values())
+        for entry in entries:
+            if entry.dirty:
+                with entry.lock:
+                    try:
+                        self._write(entry)
+                    except Exception as e:
+                        # Liste kirli kalır ve bir sonraki turda yeniden denenir.
+                        print(f"Liste diske yazılamadı ({entry.path}): {e}")
+                        with self.lock:
+                            self.flush_errors += 1
+                            self.last_flush_error = f"{entry.path}: {e}"
+
+    def discard(self, list_name, directory):
+        path = self.path_for(list_name, directory)
+        with self.lock:
+            entry = self.entries.pop(path, None)
+        if entry is not None:
+            with entry.lock:
+                entry.deleted = True
+                entry.dirty = False
+                entry.dirty_since = None
+
+    def _flush_loop(self):
+        # Beklenmeyen bir hata yazıcı iş parçacığını öldürmemeli; aksi halde sonraki değişiklikler kaybolur.
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Liste yazıcı turu başarısız: {e}")
+                with self.lock:
+                    self.flush_errors += 1
+                    self.last_flush_error = str(e)
+
+    def stats(self):
+        now = time.monotonic()
+        with self.lock:
+            dirty = [now - entry.dirty_since for entry in self.entries.values()
+                     if entry.dirty and entry.dirty_since is not None]
+            return {"entries": len(self.entries), "dirty_entries": len(dirty),
+                    "oldest_dirty_seconds": round(max(dirty), 3) if dirty else 0.0,
+                    "flush_interval_seconds": self.flush_interval, "flush_errors": self.flush_errors,
+                    "last_flush_error": self.last_flush_error, "flusher_alive": self.flusher.is_alive()}
+
+
+list_store = ListStore(LIST_FLUSH_INTERVAL_SECONDS, LIST_STAT_INTERVAL_SECONDS)
+main_lists_snapshot = ListSnapshot.open(MAIN_LISTS_SNAPSHOT_PATH)
+if main_lists_snapshot is not None:
+    list_store.snapshots[os.path.normpath(MAIN_LISTS_DIR)] = main_lists_snapshot
+atexit.register(list_store.flush)
+
+list_database = ListDatabase(LIST_DATABASE_PATH)
+list_database.ensure_user(ADMIN_USERNAME, ADMIN_PASSWORD)
+list_store.database = list_database
+list_store.database_root = os.path.normpath(LISTS_DIR)
+# Eski, ortak JSON listeleri bir kez yönetici kullanıcısının koleksiyonlarına aktarılır.
+migration = list_database.migrate_json_directory(LISTS_DIR, ADMIN_USERNAME)
+if migration["imported"]:
+    print(f"{len(migration['imported'])} JSON listesi veritabanına aktarıldı: {', '.join(migration['imported'])}")
+
+
+def current_list_owner():
+    # Arka plan işleri sahibini g.list_owner ile taşır; giriş yapılmamış istekler anonim ad alanını kullanır.
+    owner = g.get('list_owner') if has_app_context() else None
+    if owner is None and has_request_context() and session.get('logged_in'):
+        owner = session.get('username')
+    return owner or ANONYMOUS_LIST_OWNER
+
+
+def login_required_response():
+    # Koleksiyonlara yazan istekler için; anonim ad alanı salt okunurdur.
+    if current_list_owner() != ANONYMOUS_LIST_OWNER:
+        return None
+    return jsonify({"status": "error", "message": "Bu işlem için giriş yapmalısınız."}), 401
+
+
+def user_lists_dir(owner=None):
+    return os.path.join(LISTS_DIR, owner or current_list_owner())
+
+
+def list_location(path):
+    directory, file_name = os.path.split(path)
+    if directory == os.path.normpath(MAIN_LISTS_DIR):
+        return "main", None, file_name[:-5]
+    root, owner = os.path.split(directory)
+    if root == os.path.normpath(LISTS_DIR):
+        return "user", owner, file_name[:-5]
+    return None
+
+
+def text_size(words_data):
+    return sum(len(str(k).encode("utf-8")) + len(str(v).encode("utf-8")) for k, v in words_data.items())
+
+
+class ListCatalog:
+    def __init__(self, main_directory, database):
+        self.main_directory = main_directory
+        self.database = database
+        self.lock = threading.Lock()
+        self.lists = {}
+        self.instance = f"{time.time_ns():x}"
+        self.version = 0
+        self.detail_version = 0
+
+    @staticmethod
+    def _key(source, name, owner=None):
+        # Hazır listeler herkese ortaktır; kullanıcı listeleri sahibine göre ayrılır.
+        return source, (owner or current_list_owner()) if source == "user" else None, name
+
+    def _describe(self, source, name, owner=None):
+        if source == "main":
+            stat = os.stat(ListStore.path_for(name, self.main_directory))
+            size, mtime = stat.st_size, stat.st_mtime
+            directory = self.main_directory
+        else:
+            collection = self.database.collection(owner, name)
+            if collection is None:
+                raise FileNotFoundError(name)
+            size, mtime = None, collection["updated_at"]
+            directory = user_lists_dir(owner)
+        try:
+            words_data = list_store.view(name, directory=directory)
+        except (OSError, ValueError) as e:
+            print(f"'{name}' listesi okunamadı: {e}")
+            words_data = {}
+        # Veritabanındaki listeler için boyut, saklanan metnin bayt sayısıdır.
+        return {"name": name, "source": source, "word_count": len(words_data),
+                "size": text_size(words_data) if size is None else size, "mtime": mtime}
+
+    def rebuild(self):
+        lists = {}
+        if os.path.isdir(self.main_directory):
+            for filename in os.listdir(self.main_directory):
+                if filename.endswith('.json') and os.path.isfile(os.path.join(self.main_directory, filename)):
+                    lists[("main", None, filename[:-5])] = self._describe("main", filename[:-5])
+        for collection in self.database.collections():
+            owner, name = collection["owner"], collection["name"]
+            lists[("user", owner, name)] = self._describe("user", name, owner)
+        with self.lock:
+            self.lists = lists
+            self.version += 1
+            self.detail_version += 1
+
+    def refresh(self, source, name, owner=None):
+        key = self._key(source, name, owner)
+        try:
+            info = self._describe(source, name, key[1])
+        except OSError:
+            self.remove(source, name, key[1])
+            return
+        with self.lock:
+            if key not in self.lists:
+                self.version += 1
+            self.lists[key] = info
+            self.detail_version += 1
+
+    def remove(self, source, name, owner=None):
+        with self.lock:
+            if self.lists.pop(self._key(source, name, owner), None) is not None:
+                self.version += 1
+                self.detail_version += 1
+
+    def on_store_event(self, event, entry):
+        key = list_location(entry.path)
+        if key is None:
+            return
+        with self.lock:
+            info = self.lists.get(key)
+            if info is None:
+                return
+            if event == "changed":
+                info["word_count"] = len(entry.data)
+                if key[0] == "user":
+                    info["size"] = text_size(entry.data)
+                    info["mtime"] = time.time()
+            elif event == "flushed":
+                info["mtime"] = entry.mtime
+                info["size"] = os.path.getsize(entry.path)
+            self.detail_version += 1
+
+    def keys(self):
+        with self.lock:
+            return list(self.lists)
+
+    def contains(self, source, name, owner=None):
+        return self._key(source, name, owner) in self.lists
+
+    def find(self, name, order=("user", "main"), owner=None):
+        for source in order:
+            key = self._key(source, name, owner)
+            if key in self.lists:
+                return self.main_directory if source == "main" else user_lists_dir(key[1])
+        return None
+
+    def names(self, *sources, owner=None):
+        owner = owner or current_list_owner()
+        with self.lock:
+            return sorted({name for source, list_owner, name in self.lists
+                           if source in sources and list_owner in (None, owner)})
+
+    def entries(self, owner=None):
+        owner = owner or current_list_owner()
+        with self.lock:
+            return sorted((dict(info) for (_, list_owner, _), info in self.lists.items()
+                           if list_owner in (None, owner)), key=lambda i: (i["source"], i["name"]))
+
+    def etag(self, scope, detailed=False, owner=None):
+        version = self.detail_version if detailed else self.version
+        return f"{self.instance}-{version}-{scope}-{owner or current_list_owner()}"
+
+
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize_search_text(text):
+    text = str(text).replace('ı', 'i').replace('I', 'i').replace('İ', 'i').lower()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+
+def normalize_translation_key(text):
+    # Çeviri sözlüğü için yalnızca büyük/küçük harf ve boşluk farkı yok sayılır; ı/i ve aksanlar ayrı kelimelerdir.
+    return " ".join(str(text).casefold().split())
+
+
+def trigrams_of(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_edit_distance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, start=1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class VocabularySearchIndex:
+    def __init__(self, loader=None):
+        self.lock = threading.Lock()
+        # İndeks ilk sorguda kurulur; loader o ana kadarki tüm listeleri index_list ile ekler.
+        self.loader = loader
+        self.load_lock = threading.Lock()
+        self.loaded = loader is None
+        self.versions = {}
+        self.lists = {}
+        self.terms = {}
+        self.phrases = {}
+        self.trigrams = {}
+
+    @staticmethod
+    def _fields(original, translation):
+        return normalize_search_text(original), normalize_search_text(translation)
+
+    def _add_doc(self, doc_id, original, translation):
+        for field in self._fields(original, translation):
+            self.phrases.setdefault(field, set()).add(doc_id)
+            for term in SEARCH_TOKEN_PATTERN.findall(field):
+                docs = self.terms.get(term)
+                if docs is None:
+                    docs = self.terms[term] = set()
+                    for trigram in trigrams_of(term):
+                        self.trigrams.setdefault(trigram, set()).add(term)
+                docs.add(doc_id)
+
+    def _remove_doc(self, doc_id, original, translation):
+        for field in self._fields(original, translation):
+            docs = self.phrases.get(field)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self.phrases[field]
+            for term in SEARCH_TOKEN_PATTERN.findall(field):
+                docs = self.terms.get(term)
+                if docs is None:
+                    continue
+                docs.discard(doc_id)
+                if not docs:
+                    del self.terms[term]
+                    for trigram in trigrams_of(term):
+                        terms = self.trigrams.get(trigram)
+                        if terms is not None:
+                            terms.discard(term)
+                            if not terms:
+                                del self.trigrams[trigram]
+
+    def index_list(self, list_key, data, version=None):
+        # Yalnızca eklenen, silinen veya çevirisi değişen kelimeler yeniden indekslenir.
+        # list_key (kaynak, sahip, liste adı) üçlüsüdür; hazır listelerin sahibi yoktur.
+        # Sürüm verilirse eski bir okuma (ör. yükleme sırasında gelen değişiklikten önceki) yok sayılır.
+        with self.lock:
+            if version is not None:
+                if version <= self.versions.get(list_key, -1):
+                    return
+                self.versions[list_key] = version
+            old = self.lists.get(list_key, {})
+            new = {str(k): str(v) for k, v in data.items()}
+            for original, translation in old.items():
+                if new.get(original) != translation:
+                    self._remove_doc((*list_key, original), original, translation)
+            for original, translation in new.items():
+                if old.get(original) != translation:
+                    self._add_doc((*list_key, original), original, translation)
+            self.lists[list_key] = new
+
+    def remove_list(self, list_key):
+        self.index_list(list_key, {})
+        with self.lock:
+            self.lists.pop(list_key, None)
+            self.versions.pop(list_key, None)
+
+    def on_store_event(self, event, entry):
+        # Kurulmamış indeks değişiklikleri izlemez; ilk sorgudaki yükleme güncel veriyi okur.
+        list_key = list_location(entry.path)
+        if list_key is not None and event == "changed" and self.loaded:
+            self.index_list(list_key, entry.data, entry.version)
+
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        with self.load_lock:
+            if self.loaded:
+                return
+            # Bayrak yüklemeden önce açılır: yükleme sürerken gelen değişiklikler de sürümüyle indekslenir.
+            self.loaded = True
+            with span("search_index_build"):
+                self.loader(self)
+
+    def _fuzzy_terms(self, term):
+        limit = 1 if len(term) <= 4 else 2
+        candidates = {}
+        for trigram in trigrams_of(term):
+            for candidate in self.trigrams.get(trigram, ()):
+                candidates[candidate] = candidates.get(candidate, 0) + 1
+        required = max(1, len(trigrams_of(term)) - 3 * limit)
+        matches = {}
+        for candidate, shared in candidates.items():
+            if shared >= required:
+                distance = bounded_edit_distance(term, candidate, limit)
+                if distance <= limit:
+                    matches[candidate] = distance
+        return matches
+
+    def _result(self, doc_id, match, distance):
+        source, owner, name, original = doc_id
+        return {"listName": name, "source": source, "original": original,
+                "translation": self.lists[(source, owner, name)][original], "match": match, "distance": distance}
+
+    @staticmethod
+    def _visible(doc_id, sources, owner):
+        return doc_id[0] in sources and (owner is None or doc_id[1] in (None, owner))
+
+    def lookup(self, text, sources=("main", "user"), owner=None):
+        self.ensure_loaded()
+        with self.lock:
+            docs = self.phrases.get(normalize_search_text(text), ())
+            return [self._result(doc_id, "exact", 0) for doc_id in sorted(docs, key=str)
+                    if self._visible(doc_id, sources, owner)]
+
+    def lookup_translation(self, text, owner, sources=("main", "user")):
+        # Hazır listeler ve yalnızca istekte bulunan kullanıcının kendi listeleri sözlük olarak kullanılır.
+        # Arama indeksinin kovası adaydır; eşleşme daha sıkı anahtarla (harf büyüklüğü ve boşluk) yapılır.
+        key = normalize_translation_key(text)
+        self.ensure_loaded()
+        with self.lock:
+            candidates = {}
+            for doc_id in self.phrases.get(normalize_search_text(text), ()):
+                if doc_id[0] in sources and doc_id[1] in (None, owner) and normalize_translation_key(doc_id[3]) == key:
+                    candidates[doc_id] = self.lists[doc_id[:3]][doc_id[3]]
+        if not candidates:
+            return None
+
+        # Listeler farklı çeviri veriyorsa (Orange: Portakal/Turuncu) kullanıcının kendi listesi tercih edilir;
+        # orada da tek bir çeviri yoksa yerel katman atlanır ve karar modele bırakılır.
+        for docs in (candidates, [doc_id for doc_id in candidates if doc_id[1] == owner]):
+            translations = {normalize_translation_key(candidates[doc_id]) for doc_id in docs}
+            if len(translations) == 1:
+                # Hazır listeler kullanıcı listelerinden önce gelir.
+                return candidates[min(docs, key=lambda doc_id: (sources.index(doc_id[0]), doc_id[2]))]
+        return None
+
+    def search(self, query, limit=20, fuzzy=True, sources=("main", "user"), owner=None):
+        normalized = normalize_search_text(query)
+        query_terms = SEARCH_TOKEN_PATTERN.findall(normalized)
+        if not query_terms:
+            return []
+
+        self.ensure_loaded()
+        with self.lock:
+            scored = {}
+            for doc_id in self.phrases.get(normalized, ()):
+                scored[doc_id] = (0, 0)
+
+            term_docs = []
+            for term in query_terms:
+                docs = {doc_id: 0 for doc_id in self.terms.get(term, ())}
+                # Bulanık eşleşme yalnızca terim indekste hiç yoksa denenir.
+                if fuzzy and not docs:
+                    for candidate, distance in self._fuzzy_terms(term).items():
+                        for doc_id in self.terms[candidate]:
+                            if distance < docs.get(doc_id, distance + 1):
+                                docs[doc_id] = distance
+                term_docs.append(docs)
+
+            common = set(term_docs[0]).intersection(*term_docs[1:]) if term_docs else set()
+            for doc_id in common:
+                distance = sum(docs[doc_id] for docs in term_docs)
+                rank = (1 if distance == 0 else 2, distance)
+                if doc_id not in scored or rank < scored[doc_id]:
+                    scored[doc_id] = rank
+
+            ordered = sorted((rank, len(doc_id[3]), str(doc_id), doc_id) for doc_id, rank in scored.items()
+                             if self._visible(doc_id, sources, owner))
+            labels = {0: "exact", 1: "token", 2: "fuzzy"}
+            return [self._result(doc_id, labels[rank[0]], rank[1]) for rank, _, _, doc_id in ordered[:limit]]
+
+    def stats(self):
+        with self.lock:
+            return {"loaded": self.loaded, "lists": len(self.lists),
+                    "documents": sum(len(words) for words in self.lists.values()),
+                    "terms": len(self.terms), "trigrams": len(self.trigrams)}
+
+
+def load_search_index(index):
+    for source, owner, name in list_catalog.keys():
+        directory = list_catalog.main_directory if source == "main" else user_lists_dir(owner)
+        try:
+            (_, version), words_data = list_store.snapshot(name, directory=directory)
+        except (OSError, ValueError) as e:
+            print(f"'{name}' listesi arama indeksine eklenemedi: {e}")
+            continue
+        index.index_list((source, owner, name), words_data, version)
+
+
+list_catalog = ListCatalog(MAIN_LISTS_DIR, list_database)
+search_index = VocabularySearchIndex(loader=load_search_index)
+list_store.listeners.append(list_catalog.on_store_event)
+list_store.listeners.append(search_index.on_store_event)
+list_catalog.rebuild()
 
 
-def generateJSON(jName):
-    os.makedirs(LISTS_DIR, exist_ok=True)
-    full_path = os.path.join(LISTS_DIR, f"{jName}.json")
-    if not os.path.exists(full_path):
-        with open(full_path, "w", encoding="utf-8") as f:
-            json.dump({}, f, indent=4)
+class TranslationResolver:
+    tiers = ("local", "cache", "shared", "model")
 
+    def __init__(self, index, sources=("main", "user")):
+        self.index = index
+        self.sources = sources
+        self.lock = threading.Lock()
+        self.counts = {tier: 0 for tier in self.tiers}
 
-def load_list_data(list_name, directory=LISTS_DIR):
-    full_path = os.path.join(directory, f"{list_name}.json")
-    if os.path.exists(full_path):
-        with open(full_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+    def count(self, tier, amount=1):
+        with self.lock:
+            self.counts[tier] += amount
 
+    def resolve_local(self, text, owner):
+        translation = self.index.lookup_translation(text, owner, self.sources)
+        if translation is None or is_failed_translation(translation):
+            return None
+        self.count("local")
+        return translation.strip()
 
-def save_list_data(list_name, data, directory=LISTS_DIR):
-    full_path = os.path.join(directory, f"{list_name}.json")
-    os.makedirs(directory, exist_ok=True)
-    with open(full_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    def resolve(self, text, owner):
+        translation = self.resolve_local(text, owner)
+        if translation is not None:
+            return translation, "local"
+
+        translation, served_by = list_object_translate_with_source(text)
+        self.count(served_by)
+        return translation, served_by
+
+    async def resolve_async(self, text, owner):
+        translation = self.resolve_local(text, owner)
+        if translation is not None:
+            return translation, "local"
+
+        translation, served_by = await list_object_translate_with_source_async(text)
+        self.count(served_by)
+        return translation, served_by
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        return {**counts, "total": total,
+                "localRatio": round(counts["local"] / total, 4) if total else 0.0,
+                "modelRatio": round(counts["model"] / total, 4) if total else 0.0}
+
+
+translation_resolver = TranslationResolver(search_index)
+
+
+def is_valid_question(result):
+    if not isinstance(result, dict) or 'error' in result:
+        return False
+    if not all(isinstance(result.get(key), str) and result[key].strip() for key in REQUIRED_QUESTION_KEYS):
+        return False
+    return result['correct_answer'] not in (result['distractor1'], result['distractor2'])
+
+
+def question_matches_word(result, word):
+    # Banka kelimeye göre anahtarlanır; doğru cevap kelimenin kendisi ya da çekimli hali olmalı.
+    answer = result['correct_answer'].strip().lower()
+    word = str(word).strip().lower()
+    if not word:
+        return False
+    return word in answer or answer in word or len(os.path.commonprefix([word, answer])) >= max(3, len(word) - 2)
+
+
+class QuestionBank:
+    def __init__(self, directory, variants, workers, queue_size):
+        self.directory = directory
+        self.variants = variants
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.counters = {"hits": 0, "misses": 0, "generated": 0, "rejected": 0, "dropped": 0}
+        for index in range(workers):
+            threading.Thread(target=self._worker, name=f"question-bank-{index}", daemon=True).start()
+
+    @staticmethod
+    def _key(word, level):
+        return f"{level}|{word}"
+
+    def _count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def get(self, list_name, word, level):
+        variants = [v for v in list_store.view(list_name, directory=self.directory).get(self._key(word, level), [])
+                    if question_matches_word(v, word)]
+        self._count("hits" if variants else "misses")
+        return random.choice(variants) if variants else None
+
+    def add(self, list_name, word, level, question):
+        if not is_valid_question(question) or not question_matches_word(question, word):
+            self._count("rejected")
+            return False
+        question = {key: question[key].strip() for key in REQUIRED_QUESTION_KEYS}
+        key = self._key(word, level)
+
+        def mutate(bank):
+            variants = [v for v in bank.get(key, []) if v['question_sentence'] != question['question_sentence']]
+            bank[key] = (variants + [question])[-self.variants:]
+
+        list_store.update(list_name, mutate, directory=self.directory)
+        self._count("generated")
+        return True
+
+    def enqueue(self, list_name, word, level):
+        key = (list_name, word, level)
+        variants = list_store.view(list_name, directory=self.directory).get(self._key(word, level), [])
+        with self.lock:
+            if len(variants) >= self.variants or key in self.pending:
+                return
+            self.pending.add(key)
+        try:
+            self.queue.put_nowait(key)
+        except queue.Full:
+            with self.lock:
+                self.pending.discard(key)
+                self.counters["dropped"] += 1
+
+    def _worker(self):
+        while True:
+            list_name, word, level = self.queue.get()
+            added = False
+            try:
+                # Arka plan dolumu, etkileşimli istekler için kota payı bırakır.
+                while not gemini_limiter.has_headroom(QUESTION_BANK_MIN_FREE_REQUESTS):
+                    time.sleep(1)
+                result = generate_question(prompt_icerik=word, konu=list_name, level=level)
+                added = self.add(list_name, word, level, result)
+            except Exception as e:
+                print(f"Soru bankası dolumu hatası ('{word}', {level}): {e}")
+            finally:
+                with self.lock:
+                    self.pending.discard((list_name, word, level))
+                self.queue.task_done()
+            # Başarısız anahtarlar bir sonraki quiz isteğinde yeniden sıraya girer.
+            if added:
+                self.enqueue(list_name, word, level)
+
+    def warm(self, list_names, levels):
+        for list_name in list_names:
+            directory = list_catalog.find(list_name)
+            if directory is None:
+                print(f"Soru bankası: '{list_name}' listesi bulunamadı.")
+                continue
+            for word in list(list_store.view(list_name, directory=directory).keys()):
+                for level in levels:
+                    self.enqueue(list_name, word, level)
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, pending=len(self.pending), queue_depth=self.queue.qsize(),
+                        variants_per_key=self.variants)
+
+
+class DistractorIndex:
+    TURKISH_VERB_SUFFIXES = ('mek', 'mak')
+    SAMPLE_ATTEMPTS = 12
+
+    def __init__(self, words_data):
+        # Anlık görüntü listeleri sıra erişimli tembel bir görünüm döndürür; yalnızca sözlükler kopyalanır.
+        items = words_data.items()
+        self.items = items if isinstance(items, Sequence) else list(items)
+        self.translations = list(dict.fromkeys(translation for _, translation in self.items))
+        self.buckets = {}
+        self.coarse_buckets = {}
+        for translation in self.translations:
+            kind, length_bucket = self.bucket_of(translation)
+            self.buckets.setdefault((kind, length_bucket), []).append(translation)
+            self.coarse_buckets.setdefault(kind, []).append(translation)
+
+    @classmethod
+    def bucket_of(cls, translation):
+        text = str(translation).strip().lower()
+        if ' ' in text:
+            kind = 'phrase'
+        elif text.endswith(cls.TURKISH_VERB_SUFFIXES):
+            kind = 'verb'
+        else:
+            kind = 'word'
+        return kind, min(len(text) // 4, 5)
+
+    def _pick(self, pool, correct_answer, chosen, count):
+        # Havuzdan rastgele seçip tekrarları reddeder; havuz boyutundan bağımsız, beklenen O(1).
+        if len(pool) <= 1:
+            return
+        for _ in range(self.SAMPLE_ATTEMPTS * count):
+            if len(chosen) >= count:
+                return
+            candidate = pool[random.randrange(len(pool))]
+            if candidate != correct_answer and candidate not in chosen:
+                chosen.append(candidate)
+
+    def sample(self, correct_answer, count=2):
+        kind, length_bucket = self.bucket_of(correct_answer)
+        chosen = []
+        for pool in (self.buckets.get((kind, length_bucket), []), self.coarse_buckets.get(kind, []),
+                     self.translations):
+            self._pick(pool, correct_answer, chosen, count)
+            if len(chosen) >= count:
+                return chosen
+        if len(self.translations) - 1 >= count:
+            remaining = [t for t in self.translations if t != correct_answer and t not in chosen]
+            return chosen + random.sample(remaining, count - len(chosen))
+        return None
+
+
+distractor_indexes = OrderedDict()
+distractor_indexes_lock = threading.Lock()
+
+
+def get_distractor_index(list_name, directory):
+    version_key, words_data = list_store.snapshot(list_name, directory=directory)
+    with distractor_indexes_lock:
+        cached = distractor_indexes.get(version_key[0])
+        if cached is not None and cached[0] == version_key:
+            distractor_indexes.move_to_end(version_key[0])
+            return cached[1]
+
+    index = DistractorIndex(words_data)
+    with distractor_indexes_lock:
+        distractor_indexes[version_key[0]] = (version_key, index)
+        distractor_indexes.move_to_end(version_key[0])
+        while len(distractor_indexes) > DISTRACTOR_INDEX_CACHE_ITEMS:
+            distractor_indexes.popitem(last=False)
+    return index
+
+
+question_bank = QuestionBank(QUESTION_BANK_DIR, QUESTION_BANK_VARIANTS, QUESTION_BANK_WORKERS,
+                             QUESTION_BANK_QUEUE_SIZE)
+question_bank.warm(QUESTION_BANK_WARM_LISTS, QUESTION_BANK_WARM_LEVELS)
+
+
+def sm2_review(state, quality, now):
+    ease, interval_days, repetitions, _, lapses = state or (2.5, 0.0, 0, now, 0)
+    if quality < 3:
+        repetitions = 0
+        interval_days = 1.0
+        lapses += 1
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval_days = 1.0
+        elif repetitions == 2:
+            interval_days = 6.0
+        else:
+            interval_days = round(interval_days * ease, 2)
+    ease = max(1.3, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return [round(ease, 3), interval_days, repetitions, int(now + interval_days * 86400), lapses]
+
+
+class ReviewScheduler:
+    KEY_SEPARATOR = "\u001f"
+
+    def __init__(self, directory, max_heaps):
+        self.directory = os.path.normpath(directory)
+        self.max_heaps = max_heaps
+        self.lock = threading.Lock()
+        self.heaps = OrderedDict()
+        list_store.compact_directories.add(self.directory)
+
+    @classmethod
+    def _key(cls, list_name, word):
+        return f"{list_name}{cls.KEY_SEPARATOR}{word}"
+
+    @staticmethod
+    def _store_name(user_id):
+        return "".join(c for c in str(user_id) if c.isalnum() or c in ('-', '_')) or "anonymous"
+
+    def _states(self, user_id):
+        return list_store.view(self._store_name(user_id), directory=self.directory)
+
+    def _heap(self, user_id, list_name, states):
+        # (kullanıcı, liste) başına vade yığını; eski girdiler okunurken elenir (lazy deletion).
+        heap_key = (user_id, list_name)
+        heap = self.heaps.get(heap_key)
+        if heap is not None:
+            self.heaps.move_to_end(heap_key)
+            return heap
+        prefix = f"{list_name}{self.KEY_SEPARATOR}"
+        heap = [(state[3], key[len(prefix):]) for key, state in states.items() if key.startswith(prefix)]
+        heapq.heapify(heap)
+        # Atılan yığın bir sonraki istekte kalıcı durumdan yeniden kurulur.
+        self.heaps[heap_key] = heap
+        while len(self.heaps) > self.max_heaps:
+            self.heaps.popitem(last=False)
+        return heap
+
+    def due_words(self, user_id, list_names, limit, now):
+        states = self._states(user_id)
+        due = []
+        with self.lock:
+            heaps = [(list_name, self._heap(user_id, list_name, states)) for list_name in list_names]
+            frontier = [(heap[0][0], index) for index, (_, heap) in enumerate(heaps) if heap]
+            heapq.heapify(frontier)
+            popped = []
+            while frontier and len(due) < limit:
+                due_at, index = heapq.heappop(frontier)
+                if due_at > now:
+                    break
+                list_name, heap = heaps[index]
+                entry = heapq.heappop(heap)
+                state = states.get(self._key(list_name, entry[1]))
+                if state is not None and state[3] == entry[0]:
+                    due.append((list_name, entry[1]))
+                    popped.append((heap, entry))
+                if heap:
+                    heapq.heappush(frontier, (heap[0][0], index))
+            for heap, entry in popped:
+                heapq.heappush(heap, entry)
+        return due
+
+    def new_words(self, user_id, list_items, limit, exclude):
+        states = self._states(user_id)
+        picked = []
+        candidates = [(list_name, word) for list_name, items in list_items for word, _ in
+                      random.sample(items, min(len(items), limit * 3))]
+        random.shuffle(candidates)
+        for list_name, word in candidates:
+            if len(picked) >= limit:
+                break
+            if (list_name, word) not in exclude and self._key(list_name, word) not in states:
+                picked.append((list_name, word))
+                exclude.add((list_name, word))
+        return picked
+
+    def record(self, user_id, list_name, word, quality, now):
+        key = self._key(list_name, word)
+
+        def mutate(states):
+            states[key] = sm2_review(states.get(key), quality, now)
+            return states[key]
+
+        new_state = list_store.update(self._store_name(user_id), mutate, directory=self.directory)
+        with self.lock:
+            heap = self.heaps.get((user_id, list_name))
+            if heap is not None:
+                heapq.heappush(heap, (new_state[3], word))
+        return new_state
+
+
+review_scheduler = ReviewScheduler(SRS_DIR, SRS_HEAP_CACHE_ITEMS)
+
+
+def load_list_data(list_name, directory=None):
+    return list_store.load(list_name, directory=directory or user_lists_dir())
+
+
+def save_list_data(list_name, data, directory=None):
+    list_store.save(list_name, data, directory=directory or user_lists_dir())
 
 
 def gemini_chat_response(user_message, topic_id):
-    prompt_template = prompts_data.get(topic_id)
-    if not prompt_template:
+    final_prompt = prompt_registry.render(topic_id, user_message=user_message)
+    if not final_prompt:
         print(f"HATA: teacher_prompts.json dosyasında '{topic_id}' için prompt bulunamadı.")
         return "Üzgünüm, bu konu hakkında şu anda sana yardımcı olamıyorum."
 
-    final_prompt = prompt_template.replace("{user_message}", user_message)
-
     try:
-        response = model.generate_content(final_prompt)
-        return response.text.strip()
+        return gemini_generate(topic_id, final_prompt, use_cache=False).strip()
     except Exception as e:
         print(f"Gemini AI Teacher hatası: {e}")
         return f"Yapay zekadan yanıt alınırken bir hata oluştu: {e}"
 
 
 def ensure_english(text):
-    prompt_template = prompts_data.get("ensure_english_prompt")
+    final_prompt = prompt_registry.render("ensure_english_prompt", text_to_clean=text)
 
-    if not prompt_template:
+    if not final_prompt:
         print("HATA: 'ensure_english_prompt' anahtarı JSON dosyasında bulunamadı.")
         return text
 
-    final_prompt = prompt_template.replace("{text_to_clean}", text)
+    try:
+        return gemini_generate("ensure_english_prompt", final_prompt).strip()
+    except Exception as e:
+        print(f"ensure_english hatası: {e}")
+        return text
+
+
+def extract_generated_text(response_text):
+    try:
+        parsed = parse_json_response(response_text)
+    except ValueError:
+        return response_text.strip()
+    if isinstance(parsed, dict) and isinstance(parsed.get("text"), str):
+        return parsed["text"].strip()
+    return response_text.strip()
+
+
+def validate_generated_text(response_text):
+    text = extract_generated_text(response_text)
+    passed = is_likely_english(text)
+    with generator_stats_lock:
+        generator_stats["generated"] += 1
+        generator_stats["passed_locally" if passed else "ensure_english_fallbacks"] += 1
+    return text, passed
+
+
+async def ensure_english_async(text):
+    final_prompt = prompt_registry.render("ensure_english_prompt", text_to_clean=text)
+
+    if not final_prompt:
+        print("HATA: 'ensure_english_prompt' anahtarı JSON dosyasında bulunamadı.")
+        return text
 
     try:
-        response = model.generate_content(final_prompt)
-        return response.text.strip()
+        cleaned_text, _ = await gemini_generate_with_source_async("ensure_english_prompt", final_prompt)
+        return cleaned_text.strip()
     except Exception as e:
         print(f"ensure_english hatası: {e}")
         return text
 
 
-def gemini_smart_translate(text_to_translate, target_level, is_academic):
+def render_smart_translate_prompt(text_to_translate, target_level, is_academic):
     if is_academic:
         prompt_key = "smart_translate_academic_prompt"
     else:
         prompt_key = "smart_translate_standard_prompt"
 
-    prompt_template = prompts_data.get(prompt_key)
+    return prompt_key, prompt_registry.render(prompt_key, target_level=target_level,
+                                              text_to_translate=text_to_translate)
+
 
-    if not prompt_template:
+def gemini_smart_translate(text_to_translate, target_level, is_academic):
+    prompt_key, final_prompt = render_smart_translate_prompt(text_to_translate, target_level, is_academic)
+
+    if not final_prompt:
         error_message = f"HATA: '{prompt_key}' anahtarı JSON dosyasında bulunamadı."
         print(error_message)
         return error_message
 
-    final_prompt = prompt_template.replace("{target_level}", target_level) \
-        .replace("{text_to_translate}", text_to_translate)
+    try:
+        return gemini_generate(prompt_key, final_prompt).strip()
+    except exceptions.ResourceExhausted:
+        raise
+    except Exception as e:
+        print(f"Akıllı Gemini çeviri hatası: {e}")
+        return f"Çeviri sırasında bir hata oluştu: {e}"
+
+
+async def gemini_smart_translate_async(text_to_translate, target_level, is_academic):
+    prompt_key, final_prompt = render_smart_translate_prompt(text_to_translate, target_level, is_academic)
+
+    if not final_prompt:
+        error_message = f"HATA: '{prompt_key}' anahtarı JSON dosyasında bulunamadı."
+        print(error_message)
+        return error_message
 
     try:
-        response = model.generate_content(final_prompt)
-        return response.text.strip()
+        text, _ = await gemini_generate_with_source_async(prompt_key, final_prompt)
+        return text.strip()
+    except exceptions.ResourceExhausted:
+        raise
     except Exception as e:
         print(f"Akıllı Gemini çeviri hatası: {e}")
         return f"Çeviri sırasında bir hata oluştu: {e}"
@@ -169,6 +2403,194 @@ app = Flask(__name__)
 app.secret_key = 'buraya_guvenli_bir_anahtar_yazin'
 app.permanent_session_lifetime = timedelta(days=1)
 
+QUOTA_EXCEEDED_MESSAGE = "Günlük Gemini API kullanım limitiniz dolmuş. Lütfen daha sonra tekrar deneyin veya API anahtarınızı kontrol edin."
+
+
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def stream_text_response(pieces, result_field, error_message, finish=None):
+    # İlk parça yanıt başlamadan alınır; böylece kota ve bağlantı hataları normal JSON hata koduyla döner.
+    pieces = iter(pieces)
+    first_piece = next(pieces, None)
+    first_pieces = [first_piece] if first_piece is not None else []
+
+    def generate():
+        collected = []
+        try:
+            for piece in itertools.chain(first_pieces, pieces):
+                collected.append(piece)
+                yield sse_event("chunk", {"text": piece})
+
+            full_text = "".join(collected).strip()
+            if finish is not None:
+                final_text = finish(full_text)
+                if final_text != full_text:
+                    yield sse_event("replace", {"text": final_text})
+                full_text = final_text
+            yield sse_event("done", {"status": "success", result_field: full_text})
+
+        except exceptions.ResourceExhausted as e:
+            print(f"Gemini Kota Hatası (akış): {e}")
+            yield sse_event("error", {"status": "error", "code": 429, "message": QUOTA_EXCEEDED_MESSAGE})
+        except Exception as e:
+            print(f"Akış sırasında hata: {e}")
+            yield sse_event("error", {"status": "error", "code": 500, "message": error_message})
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def conditional_json(etag, build_payload):
+    # Sıkıştırılmış yanıtlar zayıf ETag taşıdığı için zayıf karşılaştırma yapılır.
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(build_payload())
+    response.set_etag(etag)
+    return response
+
+
+def encode_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value, ensure_ascii=False).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+
+
+def collection_row_ids(path):
+    location = list_location(path)
+    if location is None or location[0] != "user":
+        return None
+    return list_database.word_ids(location[1], location[2])
+
+
+def page_collection_words(words_data, args, row_ids=None):
+    try:
+        limit = max(1, min(int(args.get('limit', COLLECTION_PAGE_DEFAULT_LIMIT)), COLLECTION_PAGE_MAX_LIMIT))
+    except ValueError:
+        raise ValueError("limit bir tam sayı olmalı.")
+
+    fields = [f.strip() for f in args.get('fields', ",".join(COLLECTION_WORD_FIELDS)).split(",") if f.strip()]
+    if not fields or any(f not in COLLECTION_WORD_FIELDS for f in fields):
+        raise ValueError("Geçersiz alan. Kullanılabilir alanlar: original, translation.")
+
+    sort = args.get('sort', '')
+    descending = sort.startswith('-')
+    sort_field = sort.lstrip('-')
+    if sort_field and sort_field not in COLLECTION_WORD_FIELDS:
+        raise ValueError("Geçersiz sıralama. Kullanılabilir değerler: original, translation, -original, -translation.")
+
+    query = normalize_search_text(args.get('q', ''))
+    if query:
+        items = [item for item in words_data.items()
+                 if query in normalize_search_text(item[0]) or query in normalize_search_text(item[1])]
+    else:
+        items = list(words_data.items())
+
+    # İmleç son öğenin anahtarıdır: sıralı görünümde sıralama anahtarı, sırasız görünümde satır kimliği.
+    # Araya eklenen/silinen kelimeler sayfaları kaydırmaz.
+    if sort_field:
+        column = COLLECTION_WORD_FIELDS[sort_field]
+        keyed = sorted((([normalize_search_text(item[column]), item[0]], item) for item in items), reverse=descending)
+    else:
+        if row_ids is None:
+            row_ids = {original: position for position, original in enumerate(words_data.keys())}
+        # Kimliği olmayan kelime anlık görüntüden sonra silinmiştir.
+        keyed = sorted(((row_ids[item[0]], item) for item in items if item[0] in row_ids), key=lambda pair: pair[0])
+
+    start = 0
+    cursor = args.get('cursor')
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            if not sort_field and (isinstance(position, bool) or not isinstance(position, int)):
+                raise ValueError(position)
+            start = next((i for i, (key, _) in enumerate(keyed)
+                          if (key < position if descending else key > position)), len(keyed))
+        except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+            raise ValueError("Geçersiz veya süresi geçmiş imleç.")
+
+    page = keyed[start:start + limit]
+    has_more = start + limit < len(keyed)
+    return {
+        "status": "ok",
+        "total": len(keyed),
+        "count": len(page),
+        "items": [{field: item[COLLECTION_WORD_FIELDS[field]] for field in fields} for _, item in page],
+        "nextCursor": encode_cursor(page[-1][0]) if has_more else None
+    }
+
+
+@app.after_request
+def compress_response(response):
+    if response.direct_passthrough or response.is_streamed or response.mimetype != 'application/json' \
+            or response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        encoding, body = 'br', brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    elif accepted['gzip']:
+        encoding, body = 'gzip', gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL)
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    etag, _ = response.get_etag()
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+@app.before_request
+def begin_request_metrics():
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    g.metrics_started = time.perf_counter()
+    g.metrics_context, g.metrics_token = start_request_metrics(route, profile=bool(request.headers.get(PROFILE_HEADER)))
+
+
+@app.after_request
+def add_profile_headers(response):
+    context = g.get('metrics_context')
+    if context is None:
+        return response
+    metrics.observe("app_request_duration_seconds", time.perf_counter() - g.metrics_started,
+                    route=context["route"], method=request.method, status=response.status_code)
+    if context["spans"] is not None:
+        total_ms = (time.perf_counter() - g.metrics_started) * 1000
+        timings = server_timing_header(context["spans"])
+        response.headers['Server-Timing'] = f"{timings}, total;dur={total_ms:.1f}" if timings else f"total;dur={total_ms:.1f}"
+        with request_metrics_lock:
+            tokens = dict(context["tokens"])
+        if tokens:
+            response.headers['X-Gemini-Tokens'] = ", ".join(f"{k}={v}" for k, v in tokens.items())
+    return response
+
+
+@app.teardown_request
+def end_request_metrics(error=None):
+    token = g.pop('metrics_token', None)
+    if token is not None:
+        request_metrics.reset(token)
+
+
+@app.after_request
+def add_prompt_version_header(response):
+    prompt_version = g.get('prompt_version')
+    if prompt_version:
+        response.headers['X-Prompt-Version'] = prompt_version
+    return response
+
 
 @app.route("/")
 def home():
@@ -210,17 +2632,40 @@ def login():
         username = data.get("username")
         password = data.get("password")
 
-        if username == "admin" and password == "123456":
+        if isinstance(username, str) and isinstance(password, str) and list_database.verify_user(username, password):
             session['logged_in'] = True
+            session['username'] = username
             return jsonify({"message": "Giriş başarılı"}), 200
         else:
             return jsonify({"message": "Kullanıcı adı veya şifre hatalı."}), 401
     return render_template("login.html")
 
 
+@app.route("/register", methods=["POST"])
+def register():
+    data = request.get_json()
+    if not data:
+        return jsonify({"message": "JSON veri bulunamadı."}), 400
+    username = data.get("username")
+    password = data.get("password")
+
+    if not isinstance(username, str) or not USERNAME_PATTERN.fullmatch(username):
+        return jsonify({"message": "Kullanıcı adı 3-32 karakter olmalı; yalnızca harf, rakam, '-' ve '_' içerebilir."}), 400
+    if not isinstance(password, str) or len(password) < MIN_PASSWORD_LENGTH:
+        return jsonify({"message": f"Şifre en az {MIN_PASSWORD_LENGTH} karakter olmalı."}), 400
+
+    if not list_database.create_user(username, password):
+        return jsonify({"message": "Bu kullanıcı adı zaten alınmış."}), 409
+
+    session['logged_in'] = True
+    session['username'] = username
+    return jsonify({"message": "Kayıt başarılı"}), 201
+
+
 @app.route("/logout", methods=["POST"])
 def logout():
     session.pop('logged_in', None)
+    session.pop('username', None)
     return redirect(url_for('login'))
 
 
@@ -229,16 +2674,38 @@ def collection_detail(collection_name):
     if not session.get('logged_in'):
         return redirect(url_for('login'))
 
-    is_main_list = False
-    main_list_path = os.path.join(MAIN_LISTS_DIR, f"{collection_name}.json")
-    if os.path.exists(main_list_path):
-        is_main_list = True
+    is_main_list = list_catalog.contains("main", collection_name)
 
     return render_template("collection_detail.html",
                            collection_name=collection_name,
                            is_main_list=is_main_list)
 
 
+def chat_prompt_text(chat, message):
+    history_text = "".join(getattr(part, 'text', '') for content in chat.history for part in content.parts)
+    return history_text + message
+
+
+def summarize_chat_turns(previous_summary, conversation):
+    final_prompt = prompt_registry.render("chat_summary_prompt", previous_summary=previous_summary,
+                                          conversation=conversation)
+    if not final_prompt:
+        print("HATA: 'chat_summary_prompt' anahtarı JSON dosyasında bulunamadı.")
+        return None
+    return gemini_generate("chat_summary_prompt", final_prompt, use_cache=False).strip()
+
+
+if CHAT_SUMMARIZE_TRIMMED_TURNS:
+    chat_sessions.summarizer = summarize_chat_turns
+
+
+def get_session_id():
+    session_id = session.get('sid')
+    if not session_id:
+        session_id = session['sid'] = uuid.uuid4().hex
+    return session_id
+
+
 @app.route("/api/chat", methods=["POST"])
 def chat_message():
     data = request.get_json()
@@ -251,62 +2718,120 @@ def chat_message():
     if not topic_id:
         return jsonify({"status": "error", "message": "Konu ID'si (topicId) eksik."}), 400
 
-    if not user_message and topic_id in chat_sessions:
-        print(f"'{topic_id}' için eski oturum temizleniyor ve yeni bir tane başlatılıyor...")
-        del chat_sessions[topic_id]
-
-    if topic_id not in chat_sessions:
-        print(f"'{topic_id}' için YENİ sohbet oturumu başlatılıyor...")
-
-        initial_prompt_text = prompts_data.get(topic_id)
-        if not initial_prompt_text:
-            print(f"HATA: '{topic_id}' anahtarı {SYSTEM_PROMPTS_PATH} dosyasında bulunamadı.")
-            return jsonify({"status": "error", "message": "Bu konu için bir pratik başlatılamadı."}), 404
-
-        if isinstance(initial_prompt_text, dict):
-            prompt_object = initial_prompt_text
-            role = prompt_object.get('role', 'İngilizce Öğretmeni.')
-            persona = prompt_object.get('persona', 'Destekleyici ve profesyonel.')
-            methodology = prompt_object.get('methodology', '')
-            task = prompt_object.get('task', 'Konuyla ilgili pratik yap.')
-            initial_prompt_text = f"ROLE: {role}\nPERSONA: {persona}\nMETHODOLOGY: {methodology}\nTASK: {task}"
-
-        try:
-            chat = model.start_chat(history=[
-                {'role': 'user', 'parts': [initial_prompt_text]}
-            ])
-            chat_sessions[topic_id] = chat
-
-        except Exception as e:
-            print(f"Gemini chat başlatma hatası: {e}")
-            return jsonify({"status": "error", "message": "Yapay zeka ile sohbet başlatılırken bir hata oluştu."}), 500
-
-    chat = chat_sessions[topic_id]
+    session_key, chat, error_response = open_chat_session(topic_id, user_message)
+    if error_response:
+        return error_response
 
     try:
         if not user_message:
             if len(chat.history) == 1:
                 print(f"'{topic_id}' için dinamik başlangıç mesajı üretiliyor...")
 
-                response = chat.send_message("Başla.")
+                response = call_gemini(lambda: chat.send_message("Başla."), chat_prompt_text(chat, "Başla."))
                 bot_response_text = response.text
             else:
                 bot_response_text = chat.history[-1].parts[0].text
         else:
-            response = chat.send_message(user_message)
+            response = call_gemini(lambda: chat.send_message(user_message), chat_prompt_text(chat, user_message))
             bot_response_text = response.text
 
+        chat_sessions.trim_history(chat)
         return jsonify({"status": "success", "botResponse": bot_response_text})
 
     except Exception as e:
         print(f"Gemini mesaj gönderme hatası: {e}")
-        if topic_id in chat_sessions:
-            del chat_sessions[topic_id]
+        chat_sessions.drop(session_key)
         return jsonify({"status": "error", "message": "Yapay zekadan yanıt alınırken bir hata oluştu."}), 500
 
 
+@app.route("/api/chat-stream", methods=["POST"])
+def chat_message_stream():
+    data = request.get_json()
+    if not data:
+        return jsonify({"status": "error", "message": "JSON veri bulunamadı."}), 400
+
+    topic_id = data.get("topicId")
+    user_message = data.get("message", "").strip()
+
+    if not topic_id:
+        return jsonify({"status": "error", "message": "Konu ID'si (topicId) eksik."}), 400
+
+    session_key, chat, error_response = open_chat_session(topic_id, user_message)
+    if error_response:
+        return error_response
+
+    if not user_message and len(chat.history) > 1:
+        return stream_text_response(iter([chat.history[-1].parts[0].text]), "botResponse",
+                                    "Yapay zekadan yanıt alınırken bir hata oluştu.")
+
+    def pieces():
+        try:
+            message = user_message or "Başla."
+            prompt_text = chat_prompt_text(chat, message)
+            # Yarım kalan akış sohbet geçmişini bozar; yeniden denemeden önce geçmiş geri yüklenir.
+            history = list(chat.history)
+
+            def restore_history():
+                chat.history = history
+
+            yield from stream_gemini_text(lambda: chat.send_message(message, stream=True), prompt_text,
+                                          reset=restore_history)
+            chat_sessions.trim_history(chat)
+        except Exception:
+            chat_sessions.drop(session_key)
+            raise
+
+    try:
+        return stream_text_response(pieces(), "botResponse", "Yapay zekadan yanıt alınırken bir hata oluştu.")
+    except exceptions.ResourceExhausted as e:
+        print(f"Gemini Kota Hatası: {e}")
+        return jsonify({"status": "error", "message": QUOTA_EXCEEDED_MESSAGE}), 429
+    except Exception as e:
+        print(f"Gemini mesaj gönderme hatası: {e}")
+        return jsonify({"status": "error", "message": "Yapay zekadan yanıt alınırken bir hata oluştu."}), 500
+
+
+def open_chat_session(topic_id, user_message, session_id=None):
+    session_key = (session_id or get_session_id(), topic_id)
+
+    if not user_message and chat_sessions.get(session_key) is not None:
+        print(f"'{topic_id}' için eski oturum temizleniyor ve yeni bir tane başlatılıyor...")
+        chat_sessions.drop(session_key)
+
+    chat = chat_sessions.get(session_key)
+    if chat is None:
+        print(f"'{topic_id}' için YENİ sohbet oturumu başlatılıyor...")
+
+        prompt_version, initial_prompt_text = prompt_registry.topic_preamble(topic_id)
+        if not initial_prompt_text:
+            print(f"HATA: '{topic_id}' anahtarı {SYSTEM_PROMPTS_PATH} dosyasında bulunamadı.")
+            return session_key, None, (jsonify({"status": "error", "message": "Bu konu için bir pratik başlatılamadı."}), 404)
+
+        try:
+            chat = model.start_topic_chat((topic_id, prompt_version), initial_prompt_text)
+            chat_sessions.put(session_key, chat)
+
+        except Exception as e:
+            print(f"Gemini chat başlatma hatası: {e}")
+            return session_key, None, (jsonify(
+                {"status": "error", "message": "Yapay zeka ile sohbet başlatılırken bir hata oluştu."}), 500)
+
+    return session_key, chat, None
+
+
+@app.route("/api/chat-metrics", methods=["GET"])
+def chat_metrics():
+    stats = chat_sessions.stats()
+    stats["context_cache"] = model.context_cache_stats()
+    return jsonify(stats)
+
+
 @app.route("/api/list-ekle", methods=["POST"])
 def list_ekle():
+    error_response = login_required_response()
+    if error_response:
+        return error_response
+
     data = request.get_json()
     list_name = data.get("listName")
 
@@ -317,44 +2842,35 @@ def list_ekle():
     if not safe_list_name:
         return jsonify({"status": "error", "mesaj": "Geçersiz liste adı."}), 400
 
-    full_path = os.path.join(LISTS_DIR, f"{safe_list_name}.json")
-    if os.path.exists(full_path):
+    if list_catalog.contains("user", safe_list_name):
         return jsonify({"status": "error", "mesaj": "Bu isimde bir liste zaten var."}), 409
 
-    generateJSON(safe_list_name)
+    list_database.create_collection(current_list_owner(), safe_list_name)
+    list_catalog.refresh("user", safe_list_name)
     return jsonify({"status": "ok", "list": safe_list_name}), 200
 
 
 @app.route('/api/get-collections', methods=['GET'])
 def get_collections():
-    collections = []
-    try:
-        if os.path.exists(LISTS_DIR):
-            collections = [
-                f[:-5] for f in os.listdir(LISTS_DIR)
-                if f.endswith('.json') and os.path.isfile(os.path.join(LISTS_DIR, f))
-            ]
-    except Exception as e:
-        print(f"Koleksiyonlar yüklenirken bir hata oluştu: {e}")
-        return jsonify({"status": "error", "message": "Sunucu hatası: Koleksiyonlar yüklenemedi."}), 500
-
-    return jsonify(collections)
+    return conditional_json(list_catalog.etag("user"), lambda: list_catalog.names("user"))
 
 
 @app.route('/api/get-main-lists', methods=['GET'])
 def get_main_lists():
-    if not os.path.exists(MAIN_LISTS_DIR):
-        return jsonify([])
+    return conditional_json(list_catalog.etag("main"), lambda: list_catalog.names("main"))
+
 
-    main_lists = [
-        f[:-5] for f in os.listdir(MAIN_LISTS_DIR)
-        if f.endswith('.json') and os.path.isfile(os.path.join(MAIN_LISTS_DIR, f))
-    ]
-    return jsonify(main_lists)
+@app.route('/api/list-catalog', methods=['GET'])
+def get_list_catalog():
+    return conditional_json(list_catalog.etag("catalog", detailed=True), list_catalog.entries)
 
 
 @app.route('/api/copy-main-list', methods=['POST'])
 def copy_main_list():
+    error_response = login_required_response()
+    if error_response:
+        return error_response
+
     data = request.get_json()
     list_name_to_copy = data.get("listName")
 
@@ -365,18 +2881,16 @@ def copy_main_list():
     if not safe_list_name:
         return jsonify({"status": "error", "message": "Geçersiz liste adı."}), 400
 
-    source_path = os.path.join(MAIN_LISTS_DIR, f"{safe_list_name}.json")
-    destination_path = os.path.join(LISTS_DIR, f"{safe_list_name}.json")
-
-    if not os.path.exists(source_path):
+    if not list_catalog.contains("main", safe_list_name):
         return jsonify({"status": "error", "message": "Kaynak liste bulunamadı."}), 404
 
-    if os.path.exists(destination_path):
+    if list_catalog.contains("user", safe_list_name):
         return jsonify({"status": "error", "message": "Bu liste zaten koleksiyonlarınızda var."}), 409
 
     try:
-        os.makedirs(LISTS_DIR, exist_ok=True)
-        shutil.copyfile(source_path, destination_path)
+        list_store.save(safe_list_name, list_store.view(safe_list_name, directory=MAIN_LISTS_DIR),
+                        directory=user_lists_dir())
+        list_catalog.refresh("user", safe_list_name)
         return jsonify({"status": "ok", "message": f"'{safe_list_name}' koleksiyonlarınıza eklendi."}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": f"Liste kopyalanırken hata oluştu: {e}"}), 500
@@ -388,17 +2902,34 @@ def get_collection_words(collection_name):
     if not safe_collection_name:
         return jsonify({"status": "error", "message": "Geçersiz koleksiyon adı."}), 400
 
-    directory = MAIN_LISTS_DIR if os.path.exists(
-        os.path.join(MAIN_LISTS_DIR, f"{safe_collection_name}.json")) else LISTS_DIR
+    directory = list_catalog.find(safe_collection_name, order=("main", "user")) or user_lists_dir()
+
+    (path, version), words_data = list_store.snapshot(safe_collection_name, directory=directory)
+    etag = hashlib.sha1(f"{list_catalog.instance}|{path}|{version}|{request.query_string.decode('latin-1')}"
+                        .encode("utf-8")).hexdigest()
 
-    words_data = load_list_data(safe_collection_name, directory=directory)
-    word_list = [{"original": k, "translation": v} for k, v in words_data.items()]
-    return jsonify(word_list)
+    # Parametresiz istekler eski şablonlarla uyum için düz dizi döndürür.
+    if not request.args:
+        return conditional_json(etag, lambda: [{"original": k, "translation": v} for k, v in words_data.items()])
+
+    try:
+        return conditional_json(etag, lambda: {**page_collection_words(words_data, request.args,
+                                                                       collection_row_ids(path)),
+                                               "collectionName": safe_collection_name})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
 
 
 @app.route('/api/add-word-to-collection', methods=['POST'])
 def add_word_to_collection():
-    data = request.get_json()
+    return add_word_response(request.get_json())
+
+
+def add_word_response(data):
+    error_response = login_required_response()
+    if error_response:
+        return error_response
+
     collection_name = data.get("collectionName")
     original_word = data.get("originalWord", "").strip()
 
@@ -409,31 +2940,114 @@ def add_word_to_collection():
     if not safe_collection_name:
         return jsonify({"status": "error", "message": "Geçersiz koleksiyon adı."}), 400
 
-    user_list_path = os.path.join(LISTS_DIR, f"{safe_collection_name}.json")
-    if not os.path.exists(user_list_path):
+    if not list_catalog.contains("user", safe_collection_name):
         return jsonify({"status": "error",
                         "message": "Kelime eklemek için önce listeyi kopyalamanız veya oluşturmanız gerekir."}), 403
 
-    translation = list_object_translate(original_word)
+    translation, served_by = translation_resolver.resolve(original_word, current_list_owner())
 
-    if "hata oluştu" in translation.lower() or "içerik anlaşılmadı" in translation.lower():
+    if is_failed_translation(translation):
         return jsonify(
             {"status": "error", "message": f"'{original_word}' kelimesi çevrilemedi veya anlaşılamadı."}), 400
 
-    collection_data = load_list_data(safe_collection_name)
-    collection_data[original_word] = translation
-    save_list_data(safe_collection_name, collection_data)
+    list_store.update(safe_collection_name, lambda collection_data: collection_data.update({original_word: translation}),
+                      directory=user_lists_dir())
 
     return jsonify({
         "status": "ok",
         "originalWord": original_word,
         "translation": translation,
-        "collectionName": safe_collection_name
+        "collectionName": safe_collection_name,
+        "servedBy": served_by
     })
 
 
+@app.route('/api/add-words-to-collection', methods=['POST'])
+def add_words_to_collection():
+    return add_words_response(request.get_json())
+
+
+def add_words_response(data):
+    error_response = login_required_response()
+    if error_response:
+        return error_response
+
+    collection_name = data.get("collectionName")
+    words = data.get("words")
+    if words is None and isinstance(data.get("text"), str):
+        words = data["text"].splitlines()
+
+    if not collection_name or not isinstance(words, list):
+        return jsonify({"status": "error", "message": "Koleksiyon adı veya kelime listesi eksik."}), 400
+
+    safe_collection_name = "".join(c for c in collection_name if c.isalnum() or c in (' ', '-', '_')).strip()
+    if not safe_collection_name:
+        return jsonify({"status": "error", "message": "Geçersiz koleksiyon adı."}), 400
+
+    if not list_catalog.contains("user", safe_collection_name):
+        return jsonify({"status": "error",
+                        "message": "Kelime eklemek için önce listeyi kopyalamanız veya oluşturmanız gerekir."}), 403
+
+    unique_words = list(dict.fromkeys(w.strip() for w in words if isinstance(w, str) and w.strip()))
+    if not unique_words:
+        return jsonify({"status": "error", "message": "Eklenecek kelime bulunamadı."}), 400
+    if len(unique_words) > BULK_IMPORT_MAX_WORDS:
+        return jsonify({"status": "error",
+                        "message": f"Tek seferde en fazla {BULK_IMPORT_MAX_WORDS} kelime eklenebilir."}), 400
+
+    owner = current_list_owner()
+    import_id = str(data.get("importId") or f"{safe_collection_name}-{int(time.time() * 1000)}")
+    update_bulk_import_progress(owner, import_id, status="running", collectionName=safe_collection_name,
+                                total_words=len(unique_words), translated=0, failed=0,
+                                batches_done=0, batches_total=None)
+
+    def on_progress(batches_done, batches_total, translated, failed):
+        update_bulk_import_progress(owner, import_id, batches_done=batches_done, batches_total=batches_total,
+                                    translated=translated, failed=failed)
+
+    try:
+        translations, failures = batch_translate(unique_words, progress_callback=on_progress)
+    except Exception as e:
+        print(f"Toplu kelime ekleme hatası: {e}")
+        update_bulk_import_progress(owner, import_id, status="error")
+        return jsonify({"status": "error", "message": f"Kelimeler çevrilirken hata oluştu: {e}"}), 500
+
+    if translations:
+        list_store.update(safe_collection_name, lambda collection_data: collection_data.update(translations),
+                          directory=user_lists_dir())
+
+    progress = update_bulk_import_progress(owner, import_id, status="done")
+    failed_words = [{"word": word, "reason": reason} for word, reason in failures.items()]
+
+    if not translations:
+        return jsonify({"status": "error", "message": "Hiçbir kelime çevrilemedi.", "importId": import_id,
+                        "failed": failed_words, "progress": progress}), 400
+
+    return jsonify({
+        "status": "ok",
+        "collectionName": safe_collection_name,
+        "importId": import_id,
+        "added": [{"original": word, "translation": translation} for word, translation in translations.items()],
+        "failed": failed_words,
+        "progress": progress
+    })
+
+
+@app.route('/api/bulk-import-status/<import_id>', methods=['GET'])
+def bulk_import_status(import_id):
+    # Uzun aktarmalar /api/jobs ile "add-words" işi olarak gönderilip buradan izlenebilir.
+    progress = get_bulk_import_progress(current_list_owner(), import_id)
+    if progress is None:
+        return jsonify({"status": "error", "message": "İçe aktarma bulunamadı."}), 404
+    return jsonify({"status": "ok", "importId": import_id, "progress": progress})
+
+
 @app.route('/api/delete-word-from-collection', methods=['POST'])
 def delete_word_from_collection():
+    error_response = login_required_response()
+    if error_response:
+        return error_response
+
     data = request.get_json()
     collection_name = data.get("collectionName")
     word_to_delete = data.get("wordToDelete")
@@ -445,15 +3059,14 @@ def delete_word_from_collection():
     if not safe_collection_name:
         return jsonify({"status": "error", "message": "Geçersiz koleksiyon adı."}), 400
 
-    user_list_path = os.path.join(LISTS_DIR, f"{safe_collection_name}.json")
-    if not os.path.exists(user_list_path):
+    if not list_catalog.contains("user", safe_collection_name):
         return jsonify({"status": "error", "message": "Hazır listelerden kelime silinemez."}), 403
 
-    collection_data = load_list_data(safe_collection_name)
+    deleted = list_store.update(safe_collection_name,
+                                lambda collection_data: collection_data.pop(word_to_delete, None) is not None,
+                                directory=user_lists_dir())
 
-    if word_to_delete in collection_data:
-        del collection_data[word_to_delete]
-        save_list_data(safe_collection_name, collection_data)
+    if deleted:
         return jsonify({"status": "ok", "message": f"'{word_to_delete}' başarıyla silindi."}), 200
     else:
         return jsonify({"status": "error", "message": "Kelime bulunamadı."}), 404
@@ -461,6 +3074,10 @@ def delete_word_from_collection():
 
 @app.route('/api/delete-list', methods=['POST'])
 def delete_list():
+    error_response = login_required_response()
+    if error_response:
+        return error_response
+
     data = request.get_json()
     list_name = data.get("listName")
 
@@ -468,23 +3085,27 @@ def delete_list():
         return jsonify({"status": "error", "message": "Liste adı eksik."}), 400
 
     safe_list_name = "".join(c for c in list_name if c.isalnum() or c in (' ', '-', '_')).strip()
-    full_path = os.path.join(LISTS_DIR, f"{safe_list_name}.json")
+    owner = current_list_owner()
 
-    if not os.path.exists(full_path):
+    if not list_catalog.contains("user", safe_list_name):
         return jsonify({"status": "error", "message": "Liste bulunamadı."}), 404
 
-    if os.path.join(os.path.abspath(LISTS_DIR), os.path.basename(full_path)) != os.path.abspath(full_path):
-        return jsonify({"status": "error", "message": "Geçersiz dosya yolu girişimi."}), 403
-
     try:
-        os.remove(full_path)
+        list_database.delete_collection(owner, safe_list_name)
+        list_store.discard(safe_list_name, directory=user_lists_dir(owner))
+        list_catalog.remove("user", safe_list_name)
+        search_index.remove_list(("user", owner, safe_list_name))
         return jsonify({"status": "ok", "message": f"'{safe_list_name}' listesi başarıyla silindi."}), 200
-    except OSError as e:
-        return jsonify({"status": "error", "message": f"Dosya silinirken hata oluştu: {e}"}), 500
+    except sqlite3.Error as e:
+        return jsonify({"status": "error", "message": f"Liste silinirken hata oluştu: {e}"}), 500
 
 
 @app.route('/api/rename-list', methods=['POST'])
 def rename_list():
+    error_response = login_required_response()
+    if error_response:
+        return error_response
+
     data = request.get_json()
     old_name = data.get("oldName")
     new_name = data.get("newName")
@@ -498,105 +3119,161 @@ def rename_list():
     if not safe_new_name:
         return jsonify({"status": "error", "message": "Yeni liste adı boş olamaz."}), 400
 
-    old_path = os.path.join(LISTS_DIR, f"{safe_old_name}.json")
-    new_path = os.path.join(LISTS_DIR, f"{safe_new_name}.json")
+    owner = current_list_owner()
 
-    if not os.path.exists(old_path):
+    if not list_catalog.contains("user", safe_old_name):
         return jsonify({"status": "error", "message": "Eski liste adı bulunamadı."}), 404
 
-    if os.path.exists(new_path):
+    if list_catalog.contains("user", safe_new_name):
         return jsonify({"status": "error", "message": "Bu isimde bir liste zaten var."}), 409
 
     try:
-        os.rename(old_path, new_path)
+        if not list_database.rename_collection(owner, safe_old_name, safe_new_name):
+            return jsonify({"status": "error", "message": "Bu isimde bir liste zaten var."}), 409
+        list_store.discard(safe_old_name, directory=user_lists_dir(owner))
+        list_catalog.remove("user", safe_old_name)
+        search_index.remove_list(("user", owner, safe_old_name))
+        list_catalog.refresh("user", safe_new_name)
         return jsonify({"status": "ok", "message": f"Liste adı '{safe_old_name}' olarak değiştirildi."}), 200
-    except OSError as e:
-        return jsonify({"status": "error", "message": f"Dosya adı değiştirilirken hata oluştu: {e}"}), 500
+    except sqlite3.Error as e:
+        return jsonify({"status": "error", "message": f"Liste adı değiştirilirken hata oluştu: {e}"}), 500
 
 
 @app.route('/api/get-all-quiz-lists', methods=['GET'])
 def get_all_quiz_lists():
-    all_lists = set()
-
-    base_dir = 'lists'
-
-    sub_dirs_to_scan = ['main_lists', 'user_lists']
+    return conditional_json(list_catalog.etag("all"), lambda: list_catalog.names("main", "user"))
 
-    for sub_dir in sub_dirs_to_scan:
 
-        current_path = os.path.join(base_dir, sub_dir)
-
-        if os.path.isdir(current_path):
+def generate_sentence_completion_questions(quiz_items, list_name, difficulty_level):
+    deadline = time.monotonic() + QUIZ_DEADLINE_SECONDS
+    banked = {}
+    pending = []
+    for content, _ in quiz_items:
+        banked_question = question_bank.get(list_name, content, difficulty_level)
+        if banked_question is not None:
+            banked[content] = banked_question
+        else:
+            pending.append(content)
+        question_bank.enqueue(list_name, content, difficulty_level)
+
+    # Bankada olmayan kelimeler tek prompt'ta toplu üretilir; yalnızca başarısız olanlar tek tek yeniden denenir.
+    batches = [pending[i:i + QUIZ_BATCH_SIZE] for i in range(0, len(pending), QUIZ_BATCH_SIZE)]
+    batch_futures = [submit_in_request_context(quiz_executor, generate_question_batch, batch, list_name,
+                                               difficulty_level)
+                     for batch in batches]
+    wait(batch_futures, timeout=QUIZ_DEADLINE_SECONDS)
+
+    generated = {}
+    timed_out = set()
+    retry_words = []
+    for batch, future in zip(batches, batch_futures):
+        if not future.done():
+            future.cancel()
+            timed_out.update(batch)
+            continue
+        try:
+            batch_results = future.result()
+        except Exception as e:
+            batch_results = {word: {"error": f"generate_question_batch içinde beklenmedik hata: {str(e)}"}
+                             for word in batch}
+        for word in batch:
+            result = batch_results.get(word)
+            if is_valid_question(result) and question_matches_word(result, word):
+                generated[word] = result
+            else:
+                retry_words.append(word)
+
+    futures = {content: submit_in_request_context(quiz_executor, generate_question, prompt_icerik=content,
+                                                  konu=list_name, level=difficulty_level)
+               for content in retry_words}
+    _, not_done = wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+
+    quiz_questions = []
+    error_log = []
+
+    # Sorular quiz_items sırasıyla toplanır; süre dolarsa biten sorular yine de döner.
+    for content, _ in quiz_items:
+        future = futures.get(content)
+        if content in banked:
+            result = banked[content]
+        elif content in generated:
+            result = generated[content]
+            question_bank.add(list_name, content, difficulty_level, result)
+        elif content in timed_out or future in not_done:
+            if future is not None:
+                future.cancel()
+            error_log.append(f"'{content}' için soru üretimi {QUIZ_DEADLINE_SECONDS:g} saniyelik süre sınırını aştı.")
+            continue
+        else:
             try:
-
-                for filename in os.listdir(current_path):
-                    if filename.endswith('.json'):
-                        list_name = filename[:-5]
-                        all_lists.add(list_name)
+                result = future.result()
             except Exception as e:
+                result = {"error": f"generate_question içinde beklenmedik hata: {str(e)}"}
+            question_bank.add(list_name, content, difficulty_level, result)
+
+        if isinstance(result, dict) and 'error' not in result:
+
+            if all(key in result for key in REQUIRED_QUESTION_KEYS):
+                options = [result['correct_answer'], result['distractor1'], result['distractor2']]
+                random.shuffle(options)
+                quiz_questions.append({
+                    "question": result['question_sentence'],
+                    "options": options,
+                    "correct_answer": result['correct_answer']
+                })
+            else:
 
-                print(f"'{current_path}' klasörü taranırken hata oluştu: {e}")
+                error_log.append(f"'{content}' için gelen yanıtta beklenen anahtarlar eksik.")
+        else:
+            error_message = result.get('error', 'Bilinmeyen bir hata.')
+            error_log.append(f"'{content}' için soru üretilemedi: {error_message}")
 
-    return jsonify(sorted(list(all_lists)))
+    return quiz_questions, error_log
 
 
 @app.route('/api/start-quiz', methods=['POST'])
 def start_quiz():
+    return start_quiz_response(request.get_json())
+
+
+def start_quiz_response(data):
     try:
-        data = request.get_json()
         list_name = data.get('listName')
         question_type = data.get('questionType')
         difficulty_level = data.get('difficultyLevel', 'B1')
 
-        file_path = os.path.join(LISTS_DIR, f"{list_name}.json")
-        if not os.path.exists(file_path):
-            file_path = os.path.join(MAIN_LISTS_DIR, f"{list_name}.json")
+        try:
+            requested_questions = int(data.get('questionCount', QUIZ_DEFAULT_QUESTIONS))
+        except (TypeError, ValueError):
+            return jsonify({"status": "error", "message": "Soru sayısı (questionCount) bir tam sayı olmalı."}), 400
+        requested_questions = max(1, min(requested_questions, QUIZ_MAX_QUESTIONS))
 
-        if not os.path.exists(file_path):
+        directory = list_catalog.find(list_name)
+        if directory is None:
             return jsonify({"status": "error", "message": f"'{list_name}' adında bir liste bulunamadı."}), 404
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            words_data = json.load(f)
+        distractor_index = get_distractor_index(list_name, directory)
+        all_items = distractor_index.items
 
-        if len(words_data) < 3:
+        if len(all_items) < 3:
             return jsonify({"status": "error",
                             "message": "Bu listede quiz oluşturmak için yeterli (en az 3) içerik bulunmuyor."}), 400
 
-        all_items = list(words_data.items())
-        num_questions = min(10, len(all_items))
+        num_questions = min(requested_questions, len(all_items))
         quiz_items = random.sample(all_items, num_questions)
 
         quiz_questions = []
         error_log = []
 
-        for content, translation in quiz_items:
-            if question_type == 'sentence_completion':
-                result = generate_question(prompt_icerik=content, konu=list_name, level=difficulty_level)
-
-                if isinstance(result, dict) and 'error' not in result:
-
-                    required_keys = ['question_sentence', 'correct_answer', 'distractor1', 'distractor2']
-                    if all(key in result for key in required_keys):
-                        options = [result['correct_answer'], result['distractor1'], result['distractor2']]
-                        random.shuffle(options)
-                        quiz_questions.append({
-                            "question": result['question_sentence'],
-                            "options": options,
-                            "correct_answer": result['correct_answer']
-                        })
-                    else:
+        if question_type == 'sentence_completion':
+            quiz_questions, error_log = generate_sentence_completion_questions(quiz_items, list_name, difficulty_level)
 
-                        error_log.append(f"'{content}' için gelen yanıtta beklenen anahtarlar eksik.")
-                else:
-                    error_message = result.get('error', 'Bilinmeyen bir hata.')
-                    error_log.append(f"'{content}' için soru üretilemedi: {error_message}")
-
-            elif question_type == 'translation':
+        elif question_type == 'translation':
+            for content, translation in quiz_items:
                 correct_answer = translation
-                distractor_pool = [trans for key, trans in all_items if trans != correct_answer]
+                distractors = distractor_index.sample(correct_answer, 2)
 
-                if len(distractor_pool) >= 2:
-                    distractors = random.sample(distractor_pool, 2)
+                if distractors:
                     options = [correct_answer] + distractors
                     random.shuffle(options)
                     quiz_questions.append({
@@ -624,22 +3301,165 @@ def start_quiz():
         return jsonify({"status": "error", "message": "Quiz oluşturulurken beklenmedik bir sunucu hatası oluştu."}), 500
 
 
+def get_user_id():
+    return session.get('username') or get_session_id()
+
+
+@app.route('/api/start-review-quiz', methods=['POST'])
+def start_review_quiz():
+    data = request.get_json()
+    list_names = data.get('listNames')
+    if not isinstance(list_names, list) or not list_names:
+        return jsonify({"status": "error", "message": "En az bir liste (listNames) seçilmelidir."}), 400
+
+    try:
+        requested_questions = int(data.get('questionCount', QUIZ_DEFAULT_QUESTIONS))
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "Soru sayısı (questionCount) bir tam sayı olmalı."}), 400
+    requested_questions = max(1, min(requested_questions, QUIZ_MAX_QUESTIONS))
+
+    indexes = {}
+    for list_name in dict.fromkeys(list_names):
+        directory = list_catalog.find(list_name)
+        if directory is None:
+            return jsonify({"status": "error", "message": f"'{list_name}' adında bir liste bulunamadı."}), 404
+        indexes[list_name] = get_distractor_index(list_name, directory)
+
+    user_id = get_user_id()
+    now = time.time()
+    list_items = [(list_name, index.items) for list_name, index in indexes.items()]
+
+    # Vadesi gelenler önce gelir; yeni kelimeler için ayrılan pay boş kalırsa yine vadesi gelenlerle dolar.
+    new_quota = int(requested_questions * SRS_NEW_WORD_RATIO)
+    selected = review_scheduler.due_words(user_id, list(indexes), requested_questions - new_quota, now)
+    exclude = set(selected)
+    selected += review_scheduler.new_words(user_id, list_items, requested_questions - len(selected), exclude)
+    for due_at in (now, float('inf')):
+        if len(selected) >= requested_questions:
+            break
+        extra = [item for item in review_scheduler.due_words(user_id, list(indexes),
+                                                             requested_questions + len(exclude), due_at)
+                 if item not in exclude][:requested_questions - len(selected)]
+        selected += extra
+        exclude.update(extra)
+
+    quiz_questions = []
+    error_log = []
+    for list_name, word in selected:
+        index = indexes[list_name]
+        correct_answer = list_store.view(list_name, directory=list_catalog.find(list_name)).get(word)
+        distractors = index.sample(correct_answer, 2) if correct_answer is not None else None
+        if not distractors:
+            error_log.append(f"'{word}' için yeterli çeldirici bulunamadı.")
+            continue
+        options = [correct_answer] + distractors
+        random.shuffle(options)
+        quiz_questions.append({
+            "question": f"'{word}' kelimesinin Türkçe karşılığı nedir?",
+            "options": options,
+            "correct_answer": correct_answer,
+            "listName": list_name,
+            "word": word
+        })
+
+    if not quiz_questions:
+        return jsonify({"status": "error",
+                        "message": "Seçilen listelerden tekrar sorusu oluşturulamadı. " + "; ".join(error_log)}), 400
+
+    return jsonify(quiz_questions)
+
+
+@app.route('/api/submit-review', methods=['POST'])
+def submit_review():
+    data = request.get_json(silent=True)
+    results = data.get('results') if isinstance(data, dict) else None
+    if not isinstance(results, list) or not results:
+        return jsonify({"status": "error", "message": "Sonuç listesi (results) eksik."}), 400
+    if len(results) > SRS_MAX_REVIEWS_PER_SUBMIT:
+        return jsonify({"status": "error",
+                        "message": f"Tek seferde en fazla {SRS_MAX_REVIEWS_PER_SUBMIT} sonuç gönderilebilir."}), 400
+
+    # Önce tüm sonuçlar doğrulanır; hatalı bir öğe varsa hiçbir kayıt yazılmaz.
+    reviews = []
+    list_views = {}
+    for result in results:
+        if not isinstance(result, dict):
+            return jsonify({"status": "error", "message": "Her sonuç bir JSON nesnesi olmalı."}), 400
+        list_name = result.get('listName')
+        word = result.get('word')
+        if not isinstance(list_name, str) or not isinstance(word, str) or not list_name or not word:
+            continue
+        if 'quality' in result:
+            quality = result['quality']
+            if isinstance(quality, bool) or not isinstance(quality, (int, float)) or quality != quality:
+                return jsonify({"status": "error", "message": "quality 0 ile 5 arasında bir sayı olmalı."}), 400
+            quality = int(round(max(0, min(5, quality))))
+        else:
+            quality = 4 if result.get('correct') else 1
+
+        # Yalnızca kullanıcının görebildiği listelerdeki kelimeler için kayıt tutulur.
+        if list_name not in list_views:
+            list_views[list_name] = [list_store.view(list_name, directory=directory)
+                                     for directory in (list_catalog.find(list_name, order=(source,))
+                                                       for source in ("user", "main")) if directory]
+        if not any(word in words_data for words_data in list_views[list_name]):
+            return jsonify({"status": "error",
+                            "message": f"'{list_name}' listesinde '{word}' kelimesi bulunamadı."}), 404
+        reviews.append((list_name, word, quality))
+
+    user_id = get_user_id()
+    now = time.time()
+    updated = []
+    for list_name, word, quality in reviews:
+        state = review_scheduler.record(user_id, list_name, word, quality, now)
+        updated.append({"listName": list_name, "word": word, "intervalDays": state[1], "dueAt": state[3]})
+
+    return jsonify({"status": "ok", "updated": updated})
+
+
+@app.route('/api/search', methods=['GET'])
+def search_words():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"status": "error", "message": "Arama metni (q) eksik."}), 400
+
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 200))
+    except ValueError:
+        return jsonify({"status": "error", "message": "limit bir tam sayı olmalı."}), 400
+    fuzzy = request.args.get('fuzzy', '1') not in ('0', 'false')
+    source = request.args.get('source')
+    sources = (source,) if source in ("main", "user") else ("main", "user")
+
+    started = time.perf_counter()
+    results = search_index.search(query, limit=limit, fuzzy=fuzzy, sources=sources, owner=current_list_owner())
+    took_ms = (time.perf_counter() - started) * 1000
+    return jsonify({"status": "ok", "query": query, "results": results, "tookMs": round(took_ms, 3)})
+
+
+@app.route('/api/search-stats', methods=['GET'])
+def search_stats():
+    return jsonify(search_index.stats())
+
+
 @app.route('/api/translate-text', methods=['POST'])
 def translate_text():
-    data = request.get_json()
+    return translate_text_response(request.get_json())
+
+
+def translate_text_response(data):
     text_to_translate = data.get('text')
 
     if not text_to_translate:
         return jsonify({"status": "error", "message": "Çevrilecek metin eksik."}), 400
 
     try:
-        prompt_dosyasi = "prompts/general_system_prompts.json"
-        translated_text = list_object_translate(text_to_translate)
+        translated_text, served_by = translation_resolver.resolve(text_to_translate, current_list_owner())
 
         if "Hata:" in translated_text:
             return jsonify({"status": "error", "message": translated_text}), 500
 
-        return jsonify({"status": "success", "translatedText": translated_text})
+        return jsonify({"status": "success", "translatedText": translated_text, "servedBy": served_by})
     except Exception as e:
         print(f"Çeviri sırasında hata: {e}")
         return jsonify({"status": "error", "message": "Çeviri sırasında bir sunucu hatası oluştu."}), 500
@@ -647,7 +3467,10 @@ def translate_text():
 
 @app.route('/api/generate-content', methods=['POST'])
 def generate_content():
-    data = request.get_json()
+    return generate_content_response(request.get_json())
+
+
+def generate_content_response(data):
     list_name = data.get('listName')
     content_type = data.get('contentType')
     level = data.get('level')
@@ -657,55 +3480,338 @@ def generate_content():
             {"status": "error", "message": "Eksik parametreler: Liste, içerik tipi veya seviye belirtilmemiş."}), 400
 
     try:
-        file_path = os.path.join(LISTS_DIR, f"{list_name}.json")
-        if not os.path.exists(file_path):
-            file_path = os.path.join(MAIN_LISTS_DIR, f"{list_name}.json")
-            if not os.path.exists(file_path):
-                return jsonify({"status": "error", "message": "Liste bulunamadı."}), 404
+        prompt_key, final_prompt, error_response = prepare_generator_prompt(list_name, content_type, level,
+                                                                            structured=True)
+        if error_response:
+            return error_response
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            words_data = json.load(f)
+        response_text, _ = gemini_generate_with_source(prompt_key, final_prompt, use_cache=False,
+                                                       generation_config=GENERATOR_JSON_CONFIG)
 
-        if len(words_data) < 3:
-            return jsonify({"status": "error",
-                            "message": "Seçtiğiniz listede içerik üretmek için yeterli (en az 3) kelime yok."}), 400
-
-        english_words_for_topic = [key for key in words_data.keys() if is_likely_english(key)]
-        if len(english_words_for_topic) < 3:
-            return jsonify({"status": "error",
-                            "message": "Seçilen listede içerik üretmek için yeterli (en az 3) İngilizce kelime bulunamadı."}), 400
+        # İkinci model çağrısı yalnızca yerel dil kontrolü başarısız olursa yapılır.
+        final_english_text, passed = validate_generated_text(response_text)
+        if not passed:
+            final_english_text = ensure_english(final_english_text)
 
-        topic_words = random.sample(english_words_for_topic, 3)
-        topic = ", ".join(topic_words)
+        return jsonify({"status": "success", "generated_text": final_english_text})
 
-        prompt_key = ""
-        if content_type == 'paragraph':
-            prompt_key = "generator_paragraph_prompt"
-        elif content_type == 'dialogue':
-            prompt_key = "generator_dialogue_prompt"
+    except Exception as e:
+        print(f"İçerik üretilirken hata: {e}")
+        return jsonify({"status": "error", "message": f"Sunucuda beklenmedik bir hata oluştu: {e}"}), 500
 
-        if not prompt_key:
-            return jsonify({"status": "error", "message": "Geçersiz içerik tipi."}), 400
 
-        # Düzeltilmiş kısım: prompts_data sözlüğü kullanılmalı
-        prompt_template = prompts_data.get(prompt_key)
-        if not prompt_template:
-            return jsonify({"status": "error", "message": f"'{prompt_key}' prompt'u JSON dosyasında bulunamadı."}), 500
+@app.route('/api/generate-content-stream', methods=['POST'])
+def generate_content_stream():
+    data = request.get_json()
+    list_name = data.get('listName')
+    content_type = data.get('contentType')
+    level = data.get('level')
 
-        final_prompt = prompt_template.replace("{topic}", topic).replace("{level}", level)
+    if not all([list_name, content_type, level]):
+        return jsonify(
+            {"status": "error", "message": "Eksik parametreler: Liste, içerik tipi veya seviye belirtilmemiş."}), 400
 
-        response = model.generate_content(final_prompt)
-        initial_generated_text = response.text
+    try:
+        prompt_key, final_prompt, error_response = prepare_generator_prompt(list_name, content_type, level)
+        if error_response:
+            return error_response
 
-        final_english_text = ensure_english(initial_generated_text)
+        return stream_text_response(gemini_stream(prompt_key, final_prompt, use_cache=False), "generated_text",
+                                    "İçerik üretilirken beklenmedik bir hata oluştu.",
+                                    finish=finish_streamed_text)
 
-        return jsonify({"status": "success", "generated_text": final_english_text})
+    except exceptions.ResourceExhausted as e:
+        print(f"Gemini Kota Hatası: {e}")
+        return jsonify({"status": "error", "message": QUOTA_EXCEEDED_MESSAGE}), 429
 
     except Exception as e:
         print(f"İçerik üretilirken hata: {e}")
         return jsonify({"status": "error", "message": f"Sunucuda beklenmedik bir hata oluştu: {e}"}), 500
 
 
+def finish_streamed_text(text):
+    text, passed = validate_generated_text(text)
+    return text if passed else ensure_english(text)
+
+
+def prepare_generator_prompt(list_name, content_type, level, structured=False):
+    directory = list_catalog.find(list_name)
+    if directory is None:
+        return None, None, (jsonify({"status": "error", "message": "Liste bulunamadı."}), 404)
+
+    words_data = list_store.view(list_name, directory=directory)
+
+    if len(words_data) < 3:
+        return None, None, (jsonify({"status": "error",
+                                     "message": "Seçtiğiniz listede içerik üretmek için yeterli (en az 3) kelime yok."}), 400)
+
+    english_words_for_topic = [key for key in words_data.keys() if is_likely_english(key)]
+    if len(english_words_for_topic) < 3:
+        return None, None, (jsonify({"status": "error",
+                                     "message": "Seçilen listede içerik üretmek için yeterli (en az 3) İngilizce kelime bulunamadı."}), 400)
+
+    topic_words = random.sample(english_words_for_topic, 3)
+    topic = ", ".join(topic_words)
+
+    prompt_key = ""
+    if content_type == 'paragraph':
+        prompt_key = "generator_paragraph_prompt"
+    elif content_type == 'dialogue':
+        prompt_key = "generator_dialogue_prompt"
+
+    if not prompt_key:
+        return None, None, (jsonify({"status": "error", "message": "Geçersiz içerik tipi."}), 400)
+    if structured:
+        prompt_key = prompt_key.replace("_prompt", "_structured_prompt")
+
+    final_prompt = prompt_registry.render(prompt_key, topic=topic, level=level)
+    if not final_prompt:
+        return None, None, (jsonify(
+            {"status": "error", "message": f"'{prompt_key}' prompt'u JSON dosyasında bulunamadı."}), 500)
+
+    return prompt_key, final_prompt, None
+
+
+@app.route('/api/prompt-version', methods=['GET'])
+def prompt_version():
+    snapshot = prompt_registry.current()
+    return jsonify({"version": snapshot.version, "loadedAt": snapshot.mtime, "keys": sorted(snapshot.data.keys())})
+
+
+@app.route('/api/rate-limit-stats', methods=['GET'])
+def rate_limit_stats():
+    return jsonify(gemini_limiter.stats())
+
+
+@app.route('/api/question-bank-stats', methods=['GET'])
+def question_bank_stats():
+    return jsonify(question_bank.stats())
+
+
+@app.route('/api/cache-stats', methods=['GET'])
+def cache_stats():
+    return jsonify(dict(response_cache.stats(), single_flight=gemini_single_flight.stats()))
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_view():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/generator-stats', methods=['GET'])
+def generator_stats_view():
+    with generator_stats_lock:
+        stats = dict(generator_stats)
+    stats["fallbackRate"] = round(stats["ensure_english_fallbacks"] / stats["generated"], 4) if stats["generated"] else 0.0
+    return jsonify(stats)
+
+
+@app.route('/api/translation-stats', methods=['GET'])
+def translation_stats():
+    return jsonify(translation_resolver.stats())
+
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_QUEUE_DEPTH = int(os.getenv("JOB_MAX_QUEUE_DEPTH", "100"))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "600"))
+JOB_MAX_RESULTS = int(os.getenv("JOB_MAX_RESULTS", "1000"))
+JOB_MAX_WAIT_SECONDS = float(os.getenv("JOB_MAX_WAIT_SECONDS", "25"))
+
+metrics.describe("app_job_queue_wait_seconds", "histogram", "Arka plan işlerinin kuyrukta bekleme süresi (iş tipine göre).")
+metrics.describe("app_job_duration_seconds", "histogram", "Arka plan işlerinin çalışma süresi (iş tipi ve sonuca göre).")
+
+
+class Job:
+    def __init__(self, kind, payload, owner, requester):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.owner = owner
+        # İşi gönderen kullanıcı ya da anonim oturum; sonucu yalnızca o okuyabilir.
+        self.requester = requester
+        self.state = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.http_status = None
+        self.result = None
+        self.expires_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        job = {"jobId": self.id, "type": self.kind, "state": self.state, "createdAt": self.created_at,
+               "startedAt": self.started_at, "finishedAt": self.finished_at}
+        if self.done.is_set():
+            job.update(httpStatus=self.http_status, result=self.result)
+        return job
+
+
+class JobQueue:
+    # Uzun süren model işleri HTTP isteğinden ayrılır: gönderim hemen bir iş kimliği döner, sonuç
+    # süreli ve boyutu sınırlı bir depoda tutulur. Kuyruk doluysa yeni iş kabul edilmez.
+    def __init__(self, handlers, workers, max_queue_depth, result_ttl_seconds, max_results):
+        self.handlers = handlers
+        self.workers = workers
+        self.result_ttl_seconds = result_ttl_seconds
+        self.max_results = max_results
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=max_queue_depth)
+        self.jobs = {}
+        # Bitmiş işler bitiş sırasıyla tutulur; süresi dolan hep baştadır.
+        self.finished = OrderedDict()
+        self.running = 0
+        self.run_seconds = 0.0
+        self.counters = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0, "expired": 0, "evicted": 0}
+        for index in range(workers):
+            threading.Thread(target=self._worker, name=f"job-worker-{index}", daemon=True).start()
+
+    def _expire(self, now):
+        while self.finished:
+            job_id = next(iter(self.finished))
+            if self.jobs[job_id].expires_at > now and len(self.finished) <= self.max_results:
+                break
+            self.counters["expired" if self.jobs[job_id].expires_at <= now else "evicted"] += 1
+            del self.finished[job_id]
+            del self.jobs[job_id]
+
+    def submit(self, kind, payload, owner, requester):
+        job = Job(kind, payload, owner, requester)
+        with self.lock:
+            self._expire(time.monotonic())
+            try:
+                self.queue.put_nowait(job)
+            except queue.Full:
+                self.counters["rejected"] += 1
+                return None
+            self.jobs[job.id] = job
+            self.counters["submitted"] += 1
+        return job
+
+    def get(self, job_id, requester, wait_seconds=0):
+        with self.lock:
+            self._expire(time.monotonic())
+            job = self.jobs.get(job_id)
+        # Başkasının işi bulunamamış gibi davranılır; iş kimliklerinin varlığı da sızdırılmaz.
+        if job is None or job.requester != requester:
+            return None
+        if wait_seconds > 0:
+            job.done.wait(wait_seconds)
+        return job
+
+    def retry_after_seconds(self):
+        # Kuyruktaki işlerin, ortalama iş süresine göre kabaca ne kadar sürede eriyeceği.
+        with self.lock:
+            completed = self.counters["succeeded"] + self.counters["failed"]
+            average = self.run_seconds / completed if completed else 1.0
+        return max(1, int(self.queue.qsize() * average / self.workers + 0.999))
+
+    def _run(self, job):
+        context, token = start_request_metrics(f"job:{job.kind}")
+        try:
+            with app.app_context():
+                # İş, gönderen kullanıcının listeleri üzerinde çalışır.
+                g.list_owner = job.owner
+                response = app.make_response(self.handlers[job.kind](job.payload))
+            return response.status_code, response.get_json()
+        except Exception as e:
+            print(f"Arka plan işi başarısız ({job.kind}, {job.id}): {e}")
+            return 500, {"status": "error", "message": "İş çalıştırılırken beklenmedik bir hata oluştu."}
+        finally:
+            request_metrics.reset(token)
+
+    def _worker(self):
+        while True:
+            job = self.queue.get()
+            with self.lock:
+                job.state = "running"
+                job.started_at = time.time()
+                self.running += 1
+            metrics.observe("app_job_queue_wait_seconds", job.started_at - job.created_at, type=job.kind)
+
+            started = time.perf_counter()
+            http_status, result = self._run(job)
+            elapsed = time.perf_counter() - started
+            metrics.observe("app_job_duration_seconds", elapsed, type=job.kind, status=http_status)
+
+            with self.lock:
+                job.http_status = http_status
+                job.result = result
+                job.state = "succeeded" if http_status < 400 else "failed"
+                job.finished_at = time.time()
+                job.expires_at = time.monotonic() + self.result_ttl_seconds
+                self.running -= 1
+                self.run_seconds += elapsed
+                self.counters[job.state] += 1
+                self.finished[job.id] = None
+                self._expire(time.monotonic())
+            job.done.set()
+            self.queue.task_done()
+
+    def stats(self):
+        with self.lock:
+            self._expire(time.monotonic())
+            return dict(self.counters, queue_depth=self.queue.qsize(), max_queue_depth=self.queue.maxsize,
+                        running=self.running, workers=self.workers, stored_results=len(self.finished),
+                        result_ttl_seconds=self.result_ttl_seconds, types=sorted(self.handlers))
+
+
+job_queue = JobQueue({
+    "start-quiz": start_quiz_response,
+    "generate-content": generate_content_response,
+    "translate-text": translate_text_response,
+    "add-word": add_word_response,
+    "add-words": add_words_response,
+}, JOB_WORKERS, JOB_MAX_QUEUE_DEPTH, JOB_RESULT_TTL_SECONDS, JOB_MAX_RESULTS)
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    data = request.get_json()
+    if not data:
+        return jsonify({"status": "error", "message": "JSON veri bulunamadı."}), 400
+
+    job_type = data.get('type')
+    payload = data.get('payload')
+    if job_type not in job_queue.handlers:
+        return jsonify({"status": "error", "message": f"Bilinmeyen iş tipi: {job_type}"}), 400
+    if not isinstance(payload, dict):
+        return jsonify({"status": "error", "message": "İş parametreleri (payload) bir JSON nesnesi olmalı."}), 400
+
+    job = job_queue.submit(job_type, payload, current_list_owner(), get_user_id())
+    if job is None:
+        response = jsonify({"status": "error", "message": "Sunucu şu anda çok yoğun, lütfen biraz sonra tekrar deneyin."})
+        response.headers['Retry-After'] = str(job_queue.retry_after_seconds())
+        return response, 503
+
+    response = jsonify({"status": "accepted", "queueDepth": job_queue.queue.qsize(), **job.to_dict()})
+    response.headers['Location'] = url_for('job_status', job_id=job.id)
+    return response, 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    # wait=N ile iş bitene kadar (en fazla JOB_MAX_WAIT_SECONDS) beklenir (long-polling).
+    try:
+        wait_seconds = min(max(float(request.args.get('wait', 0)), 0.0), JOB_MAX_WAIT_SECONDS)
+    except ValueError:
+        return jsonify({"status": "error", "message": "wait parametresi bir sayı olmalı."}), 400
+
+    job = job_queue.get(job_id, get_user_id(), wait_seconds)
+    if job is None:
+        return jsonify({"status": "error", "message": "İş bulunamadı veya sonucunun süresi doldu."}), 404
+    return jsonify({"status": "ok", **job.to_dict()})
+
+
+@app.route('/api/job-stats', methods=['GET'])
+def job_stats():
+    return jsonify(job_queue.stats())
+
+
+@app.route('/api/storage-stats', methods=['GET'])
+def storage_stats():
+    return jsonify({**list_database.stats(), "list_store": list_store.stats()})
+
+
 @app.route('/api/smart-translate', methods=['POST'])
 def smart_translate_route():
     data = request.get_json()
@@ -725,7 +3831,7 @@ def smart_translate_route():
         print(f"Gemini Kota Hatası: {e}")
         return jsonify({
             "status": "error",
-            "message": "Günlük Gemini API kullanım limitiniz dolmuş. Lütfen daha sonra tekrar deneyin veya API anahtarınızı kontrol edin."
+            "message": QUOTA_EXCEEDED_MESSAGE
         }), 429
 
     except Exception as e:
@@ -733,5 +3839,32 @@ def smart_translate_route():
         return jsonify({"status": "error", "message": "Çeviri sırasında beklenmedik bir sunucu hatası oluştu."}), 500
 
 
+@app.route('/api/smart-translate-stream', methods=['POST'])
+def smart_translate_stream_route():
+    data = request.get_json()
+    text_to_translate = data.get('text')
+    target_level = data.get('level')
+    is_academic = data.get('academic', False)
+
+    if not text_to_translate or not target_level:
+        return jsonify({"status": "error", "message": "Çevrilecek metin veya seviye eksik."}), 400
+
+    prompt_key, final_prompt = render_smart_translate_prompt(text_to_translate, target_level, is_academic)
+    if not final_prompt:
+        return jsonify({"status": "error", "message": f"HATA: '{prompt_key}' anahtarı JSON dosyasında bulunamadı."}), 500
+
+    try:
+        return stream_text_response(gemini_stream(prompt_key, final_prompt), "translatedText",
+                                    "Çeviri sırasında beklenmedik bir sunucu hatası oluştu.")
+
+    except exceptions.ResourceExhausted as e:
+        print(f"Gemini Kota Hatası: {e}")
+        return jsonify({"status": "error", "message": QUOTA_EXCEEDED_MESSAGE}), 429
+
+    except Exception as e:
+        print(f"Genel Çeviri Hatası: {e}")
+        return jsonify({"status": "error", "message": "Çeviri sırasında beklenmedik bir sunucu hatası oluştu."}), 500
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,298 @@
+# ASGI giriş noktası: uvicorn asgi:application --host 0.0.0.0 --port 8000
+#
+# Gemini'ye giden uzun süreli istekler (teacher sohbeti, çeviri, akıllı çeviri, içerik üretici) burada
+# async olarak işlenir; bekleme sırasında iş parçacığı tutulmaz. Bloklayan işler (sohbet açma, liste ve
+# önbellek okuma) asyncio.to_thread ile olay döngüsü dışında yapılır. Diğer tüm rotalar Flask uygulamasına, sınırlı bir
+# iş parçacığı havuzu üzerinden aktarılır. JSON sözleşmeleri Flask rotalarıyla aynıdır.
+import asyncio
+import json
+import os
+import time
+from http.cookies import SimpleCookie
+
+from a2wsgi import WSGIMiddleware
+from flask import g
+from google.api_core import exceptions
+from itsdangerous import BadSignature
+
+from app import app, chat_sessions, open_chat_session, chat_prompt_text, call_gemini_async, translation_resolver, \
+    prepare_generator_prompt, gemini_generate_with_source_async, ensure_english_async, validate_generated_text, \
+    GENERATOR_JSON_CONFIG, metrics, start_request_metrics, request_metrics, server_timing_header, PROFILE_HEADER, \
+    ANONYMOUS_LIST_OWNER, \
+    gemini_smart_translate_async, render_smart_translate_prompt, gemini_stream_async, sse_event, \
+    QUOTA_EXCEEDED_MESSAGE
+
+ASGI_WSGI_WORKERS = int(os.getenv("ASGI_WSGI_WORKERS", "32"))
+
+wsgi_application = WSGIMiddleware(app, workers=ASGI_WSGI_WORKERS)
+
+
+async def read_json(receive):
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    try:
+        return json.loads(body or b"null")
+    except ValueError:
+        return None
+
+
+async def send_response(send, response):
+    headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.items()]
+    await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": response.get_data()})
+
+
+async def send_json(send, payload, status=200):
+    # Flask'ın jsonify'ı ile aynı serileştirme kullanılır.
+    with app.app_context():
+        response = app.make_response((app.json.response(payload), status))
+    await send_response(send, response)
+
+
+async def send_flask_response(send, rv):
+    with app.app_context():
+        response = app.make_response(rv)
+    await send_response(send, response)
+
+
+def call_in_app_context(fn, *args, list_owner=None, **kwargs):
+    # asyncio.to_thread ile çağrılır; jsonify ve g kullanan yardımcılar iş parçacığında da bağlam ister.
+    with app.app_context():
+        g.list_owner = list_owner
+        return fn(*args, **kwargs)
+
+
+def session_from_scope(scope):
+    cookies = SimpleCookie()
+    for name, value in scope.get("headers", []):
+        if name == b"cookie":
+            cookies.load(value.decode("latin-1"))
+
+    morsel = cookies.get(app.config["SESSION_COOKIE_NAME"])
+    serializer = app.session_interface.get_signing_serializer(app)
+    if morsel is None or serializer is None:
+        return {}
+    try:
+        return serializer.loads(morsel.value, max_age=int(app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return {}
+
+
+def list_owner_from_session(session_data):
+    # Flask tarafındaki current_list_owner ile aynı kural: giriş yoksa anonim ad alanı kullanılır.
+    return (session_data.get("username") if session_data.get("logged_in") else None) or ANONYMOUS_LIST_OWNER
+
+
+async def chat_message(scope, receive, send):
+    session_id = session_from_scope(scope).get("sid")
+    if session_id is None:
+        # Oturum çerezi henüz yoksa Flask rotası çerezi oluşturur.
+        return await wsgi_application(scope, receive, send)
+
+    data = await read_json(receive)
+    if not data:
+        return await send_json(send, {"status": "error", "message": "JSON veri bulunamadı."}, 400)
+
+    topic_id = data.get("topicId")
+    user_message = data.get("message", "").strip()
+
+    if not topic_id:
+        return await send_json(send, {"status": "error", "message": "Konu ID'si (topicId) eksik."}, 400)
+
+    # Yeni sohbet açmak modelde bağlam önbelleği oluşturabilir; bu çağrı bloklayıcıdır.
+    session_key, chat, error_response = await asyncio.to_thread(call_in_app_context, open_chat_session, topic_id,
+                                                                user_message, session_id=session_id)
+    if error_response:
+        return await send_flask_response(send, error_response)
+
+    try:
+        if not user_message and len(chat.history) > 1:
+            bot_response_text = chat.history[-1].parts[0].text
+        else:
+            message = user_message or "Başla."
+            response = await call_gemini_async(lambda: chat.send_message_async(message),
+                                               chat_prompt_text(chat, message))
+            bot_response_text = response.text
+
+        # Kırpma sırasında özet için model çağrılabilir; olay döngüsü bloklanmaz.
+        await asyncio.to_thread(chat_sessions.trim_history, chat)
+        return await send_json(send, {"status": "success", "botResponse": bot_response_text})
+
+    except Exception as e:
+        print(f"Gemini mesaj gönderme hatası: {e}")
+        chat_sessions.drop(session_key)
+        return await send_json(send, {"status": "error", "message": "Yapay zekadan yanıt alınırken bir hata oluştu."}, 500)
+
+
+async def translate_text(scope, receive, send):
+    data = await read_json(receive) or {}
+    text_to_translate = data.get('text')
+
+    if not text_to_translate:
+        return await send_json(send, {"status": "error", "message": "Çevrilecek metin eksik."}, 400)
+
+    try:
+        owner = list_owner_from_session(session_from_scope(scope))
+        translated_text, served_by = await translation_resolver.resolve_async(text_to_translate, owner)
+
+        if "Hata:" in translated_text:
+            return await send_json(send, {"status": "error", "message": translated_text}, 500)
+
+        return await send_json(send, {"status": "success", "translatedText": translated_text, "servedBy": served_by})
+    except Exception as e:
+        print(f"Çeviri sırasında hata: {e}")
+        return await send_json(send, {"status": "error", "message": "Çeviri sırasında bir sunucu hatası oluştu."}, 500)
+
+
+async def generate_content(scope, receive, send):
+    data = await read_json(receive) or {}
+    list_name = data.get('listName')
+    content_type = data.get('contentType')
+    level = data.get('level')
+
+    if not all([list_name, content_type, level]):
+        return await send_json(send, {"status": "error",
+                                      "message": "Eksik parametreler: Liste, içerik tipi veya seviye belirtilmemiş."}, 400)
+
+    try:
+        prompt_key, final_prompt, error_response = await asyncio.to_thread(
+            call_in_app_context, prepare_generator_prompt, list_name, content_type, level, structured=True,
+            list_owner=list_owner_from_session(session_from_scope(scope)))
+        if error_response:
+            return await send_flask_response(send, error_response)
+
+        response_text, _ = await gemini_generate_with_source_async(prompt_key, final_prompt, use_cache=False,
+                                                                   generation_config=GENERATOR_JSON_CONFIG)
+
+        final_english_text, passed = validate_generated_text(response_text)
+        if not passed:
+            final_english_text = await ensure_english_async(final_english_text)
+
+        return await send_json(send, {"status": "success", "generated_text": final_english_text})
+
+    except Exception as e:
+        print(f"İçerik üretilirken hata: {e}")
+        return await send_json(send, {"status": "error", "message": f"Sunucuda beklenmedik bir hata oluştu: {e}"}, 500)
+
+
+def read_smart_translate_request(data):
+    return data.get('text'), data.get('level'), data.get('academic', False)
+
+
+async def smart_translate(scope, receive, send):
+    text_to_translate, target_level, is_academic = read_smart_translate_request(await read_json(receive) or {})
+
+    if not text_to_translate or not target_level:
+        return await send_json(send, {"status": "error", "message": "Çevrilecek metin veya seviye eksik."}, 400)
+
+    try:
+        translated_text = await gemini_smart_translate_async(text_to_translate, target_level, is_academic)
+        return await send_json(send, {"status": "success", "translatedText": translated_text})
+
+    except exceptions.ResourceExhausted as e:
+        print(f"Gemini Kota Hatası: {e}")
+        return await send_json(send, {"status": "error", "message": QUOTA_EXCEEDED_MESSAGE}, 429)
+
+    except Exception as e:
+        print(f"Genel Çeviri Hatası: {e}")
+        return await send_json(send, {"status": "error",
+                                      "message": "Çeviri sırasında beklenmedik bir sunucu hatası oluştu."}, 500)
+
+
+async def smart_translate_stream(scope, receive, send):
+    text_to_translate, target_level, is_academic = read_smart_translate_request(await read_json(receive) or {})
+
+    if not text_to_translate or not target_level:
+        return await send_json(send, {"status": "error", "message": "Çevrilecek metin veya seviye eksik."}, 400)
+
+    prompt_key, final_prompt = render_smart_translate_prompt(text_to_translate, target_level, is_academic)
+    if not final_prompt:
+        return await send_json(send, {"status": "error",
+                                      "message": f"HATA: '{prompt_key}' anahtarı JSON dosyasında bulunamadı."}, 500)
+
+    error_message = "Çeviri sırasında beklenmedik bir sunucu hatası oluştu."
+    # Flask rotasıyla aynı kural: ilk parça yanıt başlamadan alınır, erken hatalar JSON hata koduyla döner.
+    try:
+        pieces = await gemini_stream_async(prompt_key, final_prompt)
+        try:
+            first_pieces = [await pieces.__anext__()]
+        except StopAsyncIteration:
+            first_pieces = []
+    except exceptions.ResourceExhausted as e:
+        print(f"Gemini Kota Hatası: {e}")
+        return await send_json(send, {"status": "error", "message": QUOTA_EXCEEDED_MESSAGE}, 429)
+    except Exception as e:
+        print(f"Genel Çeviri Hatası: {e}")
+        return await send_json(send, {"status": "error", "message": error_message}, 500)
+
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"text/event-stream; charset=utf-8"), (b"cache-control", b"no-cache"),
+                            (b"x-accel-buffering", b"no")]})
+
+    async def send_event(event, payload, more_body=True):
+        await send({"type": "http.response.body", "body": sse_event(event, payload).encode("utf-8"),
+                    "more_body": more_body})
+
+    collected = []
+    try:
+        for piece in first_pieces:
+            collected.append(piece)
+            await send_event("chunk", {"text": piece})
+        async for piece in pieces:
+            collected.append(piece)
+            await send_event("chunk", {"text": piece})
+        await send_event("done", {"status": "success", "translatedText": "".join(collected).strip()}, more_body=False)
+
+    except exceptions.ResourceExhausted as e:
+        print(f"Gemini Kota Hatası (akış): {e}")
+        await send_event("error", {"status": "error", "code": 429, "message": QUOTA_EXCEEDED_MESSAGE}, more_body=False)
+    except Exception as e:
+        print(f"Akış sırasında hata: {e}")
+        await send_event("error", {"status": "error", "code": 500, "message": error_message}, more_body=False)
+
+
+ASYNC_ROUTES = {
+    ("POST", "/api/chat"): chat_message,
+    ("POST", "/api/translate-text"): translate_text,
+    ("POST", "/api/generate-content"): generate_content,
+    ("POST", "/api/smart-translate"): smart_translate,
+    ("POST", "/api/smart-translate-stream"): smart_translate_stream,
+}
+
+
+async def run_with_metrics(handler, scope, receive, send):
+    profile_header = PROFILE_HEADER.lower().encode("latin-1")
+    profile = any(name == profile_header and value for name, value in scope.get("headers", []))
+    context, token = start_request_metrics(scope["path"], profile=profile)
+    started = time.perf_counter()
+    status = {}
+
+    async def send_with_timing(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+            if context["spans"] is not None:
+                timings = server_timing_header(context["spans"])
+                total = f"total;dur={(time.perf_counter() - started) * 1000:.1f}"
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", (f"{timings}, {total}" if timings else total).encode("latin-1")))
+                message = dict(message, headers=headers)
+        await send(message)
+
+    try:
+        return await handler(scope, receive, send_with_timing)
+    finally:
+        metrics.observe("app_request_duration_seconds", time.perf_counter() - started,
+                        route=scope["path"], method=scope["method"], status=status.get("code", 500))
+        request_metrics.reset(token)
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http":
+        handler = ASYNC_ROUTES.get((scope["method"], scope["path"]))
+        if handler is not None:
+            return await run_with_metrics(handler, scope, receive, send)
+    return await wsgi_application(scope, receive, send)
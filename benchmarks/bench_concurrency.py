@@ -0,0 +1,81 @@
+"""Aynı anda açık tutulabilen Gemini isteklerini ölçen yük testi.
+
+Sunucu ayrı bir süreçte çalıştırılır; betik verilen uç noktaya eşzamanlı POST istekleri gönderir
+ve gecikme dağılımı ile saniyedeki istek sayısını yazdırır. Senkron ve async modu karşılaştırmak için:
+
+    flask --app app run --port 5000 --without-threads     # ya da iş parçacığı sınırlı bir WSGI sunucusu
+    uvicorn asgi:application --port 8000
+
+    python benchmarks/bench_concurrency.py --base-url http://127.0.0.1:5000 --concurrency 200
+    python benchmarks/bench_concurrency.py --base-url http://127.0.0.1:8000 --concurrency 200
+
+Varsayılan hedef /api/translate-text'tir; her istek benzersiz bir metin gönderir, böylece yerel
+sözlük ve önbellek devre dışı kalır ve her istek modele gider.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINT_PAYLOADS = {
+    "/api/translate-text": lambda i: {"text": f"benchmark sentence {i} {uuid.uuid4().hex[:8]}"},
+    "/api/generate-content": lambda i: {"listName": "A1", "contentType": "paragraph", "level": "A1"},
+}
+
+
+def post_json(url, payload, timeout):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, TimeoutError) as e:
+        print(f"İstek başarısız: {e}", file=sys.stderr)
+        status = None
+    return status, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", default="/api/translate-text", choices=sorted(ENDPOINT_PAYLOADS))
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=0, help="Toplam istek sayısı (varsayılan: concurrency)")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    total_requests = args.requests or args.concurrency
+    url = args.base_url.rstrip("/") + args.endpoint
+    make_payload = ENDPOINT_PAYLOADS[args.endpoint]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda i: post_json(url, make_payload(i), args.timeout), range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for status, latency in results if status == 200]
+    failures = len(results) - len(latencies)
+    print(f"hedef: {url}")
+    print(f"istek: {total_requests}  eşzamanlılık: {args.concurrency}  başarısız: {failures}")
+    print(f"toplam süre: {elapsed:.2f} sn  verim: {len(latencies) / elapsed:.1f} istek/sn")
+    if latencies:
+        print(f"gecikme ms  p50: {percentile(latencies, 0.5) * 1000:.0f}  p99: {percentile(latencies, 0.99) * 1000:.0f}  "
+              f"ort: {statistics.mean(latencies) * 1000:.0f}  maks: {max(latencies) * 1000:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Çeviri quizi kurulum süresini liste boyutuna göre ölçer.
+
+Eski yöntem (her soruda tüm listeyi tarayan distractor_pool) ile DistractorIndex
+karşılaştırılır. İndeks kurulumu ayrı raporlanır; uygulama indeksi liste sürümü
+değişene kadar önbellekte tuttuğu için kurulum --quizzes quize bölünerek
+amortize süre de verilir. API anahtarı gerekmez; Gemini çağrısı yapılmaz.
+Uygulama geçici bir çalışma dizininde içe aktarılır, depodaki listelere dokunulmaz.
+
+Kullanım:
+    python benchmarks/bench_distractors.py --sizes 1000,10000,50000 --questions 10 --quizzes 20
+"""
+import argparse
+import os
+import random
+import shutil
+import string
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_environment():
+    work_dir = tempfile.mkdtemp(prefix="btk-bench-")
+    for name in ("lists", "prompts"):
+        # Yerel koleksiyon veritabanı kopyalanmaz; geçici dizinde JSON listelerinden yeniden oluşturulur.
+        shutil.copytree(os.path.join(ROOT_DIR, name), os.path.join(work_dir, name),
+                        ignore=shutil.ignore_patterns("collections.sqlite3*"))
+    os.environ.setdefault("MODEL_BACKEND", "fake")
+    os.chdir(work_dir)
+    sys.path.insert(0, ROOT_DIR)
+    return work_dir
+
+
+def make_words(size, seed=42):
+    rng = random.Random(seed)
+    words = {}
+    for i in range(size):
+        stem = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+        shape = rng.random()
+        if shape < 0.25:
+            translation = stem + rng.choice(("mek", "mak"))
+        elif shape < 0.4:
+            translation = f"{stem} {stem[::-1]}"
+        else:
+            translation = stem
+        words[f"word{i}"] = translation
+    return words
+
+
+def legacy_quiz(words_data, num_questions):
+    all_items = list(words_data.items())
+    quiz_items = random.sample(all_items, min(num_questions, len(all_items)))
+    questions = []
+    for content, correct_answer in quiz_items:
+        distractor_pool = [trans for key, trans in all_items if trans != correct_answer]
+        questions.append([correct_answer] + random.sample(distractor_pool, 2))
+    return questions
+
+
+def indexed_quiz(index, num_questions):
+    quiz_items = random.sample(index.items, min(num_questions, len(index.items)))
+    return [[correct_answer] + index.sample(correct_answer, 2) for _, correct_answer in quiz_items]
+
+
+def best_of(repeats, func, *args):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000,50000,100000")
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--quizzes", type=int, default=20,
+                        help="bir indeks kurulumunun paylaştırıldığı quiz sayısı (liste değişene kadar)")
+    args = parser.parse_args()
+
+    work_dir = prepare_environment()
+    try:
+        from app import DistractorIndex, list_store
+
+        rows = []
+        for size in (int(s) for s in args.sizes.split(",")):
+            words = make_words(size)
+            legacy_ms = best_of(args.repeats, legacy_quiz, words, args.questions)
+            build_ms = best_of(args.repeats, DistractorIndex, words)
+            index = DistractorIndex(words)
+            indexed_ms = best_of(args.repeats, indexed_quiz, index, args.questions)
+            rows.append((size, legacy_ms, build_ms, indexed_ms))
+        list_store.flush()
+    finally:
+        os.chdir(ROOT_DIR)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    # Uygulamanın kendi logları tabloyla karışmasın diye sonuçlar en sonda yazdırılır.
+    quizzes = max(args.quizzes, 1)
+    print(f"\n{'liste':>8} | {'eski quiz ms':>12} | {'kurulum ms':>10} | {'index quiz ms':>13} | "
+          f"{'ilk quiz':>8} | {f'amortize ms ({quizzes})':>17} | {'amortize':>8}")
+    print("-" * 98)
+    for size, legacy_ms, build_ms, indexed_ms in rows:
+        first_ms = build_ms + indexed_ms
+        amortized_ms = build_ms / quizzes + indexed_ms
+        print(f"{size:>8} | {legacy_ms:>12.3f} | {build_ms:>10.3f} | {indexed_ms:>13.3f} | "
+              f"{legacy_ms / max(first_ms, 1e-6):>7.1f}x | {amortized_ms:>17.3f} | "
+              f"{legacy_ms / max(amortized_ms, 1e-6):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
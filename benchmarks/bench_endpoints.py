@@ -0,0 +1,203 @@
+"""Sahte model arka ucuyla uç nokta yük testi; API anahtarı gerekmez.
+
+Uygulama geçici bir çalışma dizininde (lists/ ve prompts/ kopyalanarak) MODEL_BACKEND=fake ile
+başlatılır, böylece gerçek listeler, önbellek ve soru bankası etkilenmez. Her senaryo eşzamanlı
+olarak çalıştırılır; p50/p99 gecikme ve saniyedeki istek sayısı raporlanır.
+
+Kullanım:
+    python benchmarks/bench_endpoints.py --concurrency 16 --requests 200 --latency-ms 200
+    python benchmarks/bench_endpoints.py --save baseline.json
+    python benchmarks/bench_endpoints.py --baseline baseline.json --tolerance 0.2   # gerileme varsa çıkış kodu 1
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_LIST_NAME = "bench"
+BENCH_USERNAME = "bench-user"
+BENCH_PASSWORD = "bench-password"
+
+SCENARIOS = {
+    "start-quiz-translation": ("POST", "/api/start-quiz",
+                               lambda i: {"listName": "A1", "questionType": "translation", "questionCount": 10}),
+    "start-quiz-sentence": ("POST", "/api/start-quiz",
+                            lambda i: {"listName": "A1", "questionType": "sentence_completion", "questionCount": 5,
+                                       "difficultyLevel": "B1"}),
+    "chat": ("POST", "/api/chat", lambda i: {"topicId": "family", "message": f"Hello teacher {i}"}),
+    "generate-content": ("POST", "/api/generate-content",
+                         lambda i: {"listName": "A1", "contentType": "paragraph", "level": "A2"}),
+    "add-word": ("POST", "/api/add-word-to-collection",
+                 lambda i: {"collectionName": BENCH_LIST_NAME, "originalWord": f"benchword {i} {time.time_ns()}"}),
+    "get-collections": ("GET", "/api/get-collections", None),
+    "get-collection-words": ("GET", "/api/get-collection-words/A1", None),
+    "list-catalog": ("GET", "/api/list-catalog", None),
+}
+
+
+def prepare_environment(args):
+    work_dir = tempfile.mkdtemp(prefix="btk-bench-")
+    for name in ("lists", "prompts"):
+        # Yerel koleksiyon veritabanı kopyalanmaz; geçici dizinde JSON listelerinden yeniden oluşturulur.
+        shutil.copytree(os.path.join(ROOT_DIR, name), os.path.join(work_dir, name),
+                        ignore=shutil.ignore_patterns("collections.sqlite3*"))
+
+    os.environ.update({
+        "MODEL_BACKEND": "fake",
+        "FAKE_MODEL_LATENCY_MS": str(args.latency_ms),
+        "FAKE_MODEL_JITTER_MS": str(args.jitter_ms),
+        "FAKE_MODEL_ERROR_RATE": str(args.error_rate),
+        "FAKE_MODEL_SEED": str(args.seed),
+        "GEMINI_REQUESTS_PER_MINUTE": "1000000",
+        "GEMINI_TOKENS_PER_MINUTE": "1000000000",
+        "GEMINI_BACKOFF_BASE_SECONDS": "0.05",
+    })
+    os.chdir(work_dir)
+    sys.path.insert(0, ROOT_DIR)
+    return work_dir
+
+
+def start_server():
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.port}"
+
+
+def send(method, url, payload=None, timeout=120, cookie=None):
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    headers = {"Content-Type": "application/json"}
+    if cookie:
+        headers["Cookie"] = cookie
+    request = urllib.request.Request(url, data=data, method=method, headers=headers)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, TimeoutError):
+        status = None
+    return status, time.perf_counter() - started
+
+
+def register_bench_user(base_url):
+    # Koleksiyona yazan senaryolar giriş ister; geçici veritabanında bir kullanıcı açılıp çerezi kullanılır.
+    payload = json.dumps({"username": BENCH_USERNAME, "password": BENCH_PASSWORD}).encode("utf-8")
+    request = urllib.request.Request(base_url + "/register", data=payload, method="POST",
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.headers.get("Set-Cookie", "").split(";", 1)[0]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def run_scenario(base_url, scenario, requests, concurrency, cookie=None):
+    method, path, make_payload = SCENARIOS[scenario]
+
+    def one(i):
+        return send(method, base_url + path, make_payload(i) if make_payload else None, cookie=cookie)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for status, latency in results if status is not None and status < 400]
+    return {
+        "requests": requests,
+        "errors": requests - len(latencies),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for scenario, result in results.items():
+        previous = baseline.get(scenario)
+        if not previous:
+            continue
+        if result["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{scenario}: p99 {previous['p99_ms']} -> {result['p99_ms']} ms")
+        if result["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{scenario}: verim {previous['throughput_rps']} -> {result['throughput_rps']} istek/sn")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Sonuçları JSON olarak bu dosyaya yaz")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Bilinmeyen senaryo: {', '.join(unknown)}")
+    save_path = os.path.abspath(args.save) if args.save else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    work_dir = prepare_environment(args)
+    try:
+        server, base_url = start_server()
+        cookie = register_bench_user(base_url)
+        send("POST", base_url + "/api/list-ekle", {"listName": BENCH_LIST_NAME}, cookie=cookie)
+
+        results = {scenario: run_scenario(base_url, scenario, args.requests, args.concurrency, cookie=cookie)
+                   for scenario in scenarios}
+        server.shutdown()
+    finally:
+        # Kirli listeler atexit sırasında silinmiş dizine yazılmasın diye önce diske aktarılır.
+        app_module = sys.modules.get("app")
+        if app_module is not None:
+            app_module.list_store.flush()
+        os.chdir(ROOT_DIR)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    # Uygulamanın kendi logları tabloyla karışmasın diye sonuçlar en sonda yazdırılır.
+    print(f"\n{'senaryo':<24} | {'istek':>6} | {'hata':>5} | {'p50 ms':>9} | {'p99 ms':>9} | {'istek/sn':>9}")
+    print("-" * 76)
+    for scenario, result in results.items():
+        print(f"{scenario:<24} | {result['requests']:>6} | {result['errors']:>5} | {result['p50_ms']:>9.1f} | "
+              f"{result['p99_ms']:>9.1f} | {result['throughput_rps']:>9.1f}")
+
+    if save_path:
+        with open(save_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"GERİLEME: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+# Kullanıcı koleksiyonları için gömülü SQLite deposu.
+#
+# Her kullanıcının listeleri ayrı tutulur; kelimeler (koleksiyon, kelime) üzerinde tekil indeksli
+# satırlardır, böylece bir kelime eklemek tek satırlık bir INSERT'tür. Veritabanı WAL kipinde açılır
+# (okuyucular yazarı beklemez) ve her iş parçacığı kendi bağlantısını yeniden kullanır.
+#
+# Eski JSON listelerini aktarma:  python list_database.py [json_dizini] [kullanıcı] [veritabanı]
+# Aktarılan dosyalar json_imports tablosuna yazılır; JSON dosyalarına dokunulmaz ve ikinci kez aktarılmaz.
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS collections (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    UNIQUE (user_id, name)
+);
+CREATE TABLE IF NOT EXISTS words (
+    id INTEGER PRIMARY KEY,
+    collection_id INTEGER NOT NULL REFERENCES collections(id) ON DELETE CASCADE,
+    original TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    UNIQUE (collection_id, original)
+);
+CREATE TABLE IF NOT EXISTS json_imports (
+    path TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    imported_at REAL NOT NULL
+);
+"""
+
+UPSERT_WORD = ("INSERT INTO words (collection_id, original, translation) VALUES (?, ?, ?) "
+               "ON CONFLICT (collection_id, original) DO UPDATE SET translation = excluded.translation")
+
+
+class ListDatabase:
+    def __init__(self, path, busy_timeout_seconds=5.0):
+        self.path = path
+        self.busy_timeout_seconds = busy_timeout_seconds
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections_opened = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            # İşlemler transaction() ile açıkça yönetilir (isolation_level=None).
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout_seconds, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self.local.connection = connection
+            with self.lock:
+                self.connections_opened += 1
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        connection = self.connection()
+        # Yazma kilidi baştan alınır; iki yazar okuma kilidinden yükseltme sırasında kilitlenmez.
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def create_user(self, username, password):
+        try:
+            with self.transaction() as connection:
+                connection.execute("INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
+                                   (username, generate_password_hash(password), time.time()))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def has_user(self, username):
+        return self.connection().execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone() is not None
+
+    def ensure_user(self, username, password):
+        return self.has_user(username) or self.create_user(username, password)
+
+    def verify_user(self, username, password):
+        row = self.connection().execute("SELECT password_hash FROM users WHERE username = ?",
+                                        (username,)).fetchone()
+        return row is not None and check_password_hash(row[0], password)
+
+    def _collection_id(self, connection, username, name, create=False):
+        row = connection.execute("SELECT c.id FROM collections c JOIN users u ON u.id = c.user_id "
+                                 "WHERE u.username = ? AND c.name = ?", (username, name)).fetchone()
+        if row is not None or not create:
+            return row[0] if row else None
+        user = connection.execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()
+        if user is None:
+            raise ValueError(f"Bilinmeyen kullanıcı: {username}")
+        return connection.execute("INSERT INTO collections (user_id, name, updated_at) VALUES (?, ?, ?)",
+                                  (user[0], name, time.time())).lastrowid
+
+    @staticmethod
+    def _touch(connection, collection_id):
+        connection.execute("UPDATE collections SET revision = revision + 1, updated_at = ? WHERE id = ?",
+                           (time.time(), collection_id))
+        revision = connection.execute("SELECT revision FROM collections WHERE id = ?", (collection_id,)).fetchone()[0]
+        return collection_id, revision
+
+    def collections(self, username=None):
+        query = ("SELECT u.username, c.name, c.updated_at FROM collections c JOIN users u ON u.id = c.user_id"
+                 + (" WHERE u.username = ?" if username is not None else "") + " ORDER BY u.username, c.name")
+        rows = self.connection().execute(query, (username,) if username is not None else ())
+        return [{"owner": owner, "name": name, "updated_at": updated_at} for owner, name, updated_at in rows]
+
+    def collection(self, username, name):
+        row = self.connection().execute(
+            "SELECT c.updated_at FROM collections c JOIN users u ON u.id = c.user_id "
+            "WHERE u.username = ? AND c.name = ?", (username, name)).fetchone()
+        return {"owner": username, "name": name, "updated_at": row[0]} if row else None
+
+    def create_collection(self, username, name):
+        with self.transaction() as connection:
+            if self._collection_id(connection, username, name) is not None:
+                return False
+            self._collection_id(connection, username, name, create=True)
+        return True
+
+    def delete_collection(self, username, name):
+        with self.transaction() as connection:
+            collection_id = self._collection_id(connection, username, name)
+            if collection_id is None:
+                return False
+            connection.execute("DELETE FROM collections WHERE id = ?", (collection_id,))
+        return True
+
+    def rename_collection(self, username, old_name, new_name):
+        try:
+            with self.transaction() as connection:
+                collection_id = self._collection_id(connection, username, old_name)
+                if collection_id is None:
+                    return False
+                connection.execute("UPDATE collections SET name = ? WHERE id = ?", (new_name, collection_id))
+                self._touch(connection, collection_id)
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def revision(self, username, name):
+        # Silinip yeniden oluşturulan koleksiyon yeni bir kimlik alır; bu yüzden kimlik de sürümün parçasıdır.
+        row = self.connection().execute(
+            "SELECT c.id, c.revision FROM collections c JOIN users u ON u.id = c.user_id "
+            "WHERE u.username = ? AND c.name = ?", (username, name)).fetchone()
+        return tuple(row) if row else None
+
+    def words(self, username, name):
+        # Sözlük sırası eklenme sırasıdır; JSON listelerindeki davranışla aynı.
+        rows = self.connection().execute(
+            "SELECT w.original, w.translation FROM words w JOIN collections c ON c.id = w.collection_id "
+            "JOIN users u ON u.id = c.user_id WHERE u.username = ? AND c.name = ? ORDER BY w.id", (username, name))
+        return dict(rows)
+
+    def word_ids(self, username, name):
+        # Satır kimlikleri eklenme sırasını izler ve silmelerle kaymaz; sayfalama imleçleri bunlara dayanır.
+        rows = self.connection().execute(
+            "SELECT w.original, w.id FROM words w JOIN collections c ON c.id = w.collection_id "
+            "JOIN users u ON u.id = c.user_id WHERE u.username = ? AND c.name = ?", (username, name))
+        return dict(rows)
+
+    def apply_changes(self, username, name, upserts, removed):
+        with self.transaction() as connection:
+            collection_id = self._collection_id(connection, username, name, create=True)
+            connection.executemany("DELETE FROM words WHERE collection_id = ? AND original = ?",
+                                   ((collection_id, original) for original in removed))
+            connection.executemany(UPSERT_WORD, ((collection_id, original, translation)
+                                                 for original, translation in upserts.items()))
+            return self._touch(connection, collection_id)
+
+    def replace_words(self, username, name, data):
+        with self.transaction() as connection:
+            collection_id = self._collection_id(connection, username, name, create=True)
+            connection.execute("DELETE FROM words WHERE collection_id = ?", (collection_id,))
+            connection.executemany(UPSERT_WORD, ((collection_id, str(original), str(translation))
+                                                 for original, translation in data.items()))
+            return self._touch(connection, collection_id)
+
+    def migrate_json_directory(self, directory, username):
+        summary = {"imported": [], "skipped": [], "failed": []}
+        if not os.path.isdir(directory):
+            return summary
+        connection = self.connection()
+        for file_name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, file_name)
+            if not file_name.endswith(".json") or not os.path.isfile(path):
+                continue
+            key = os.path.abspath(path)
+            if connection.execute("SELECT 1 FROM json_imports WHERE path = ?", (key,)).fetchone():
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if not isinstance(data, dict):
+                    raise ValueError("liste bir JSON nesnesi değil")
+            except (OSError, ValueError) as e:
+                print(f"'{path}' aktarılamadı: {e}")
+                summary["failed"].append(file_name[:-5])
+                continue
+
+            with self.transaction() as connection:
+                name = file_name[:-5]
+                # Aynı adlı bir koleksiyon zaten varsa üzerine yazılmaz.
+                if self._collection_id(connection, username, name) is None:
+                    collection_id = self._collection_id(connection, username, name, create=True)
+                    connection.executemany(UPSERT_WORD, ((collection_id, str(original), str(translation))
+                                                         for original, translation in data.items()))
+                    self._touch(connection, collection_id)
+                    summary["imported"].append(name)
+                else:
+                    summary["skipped"].append(name)
+                connection.execute("INSERT INTO json_imports (path, username, imported_at) VALUES (?, ?, ?)",
+                                   (key, username, time.time()))
+        return summary
+
+    def stats(self):
+        connection = self.connection()
+        counts = {table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ("users", "collections", "words")}
+        with self.lock:
+            connections_opened = self.connections_opened
+        return {"path": self.path, "journal_mode": connection.execute("PRAGMA journal_mode").fetchone()[0],
+                "connections_opened": connections_opened, **counts}
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join("lists", "user_lists")
+    owner = sys.argv[2] if len(sys.argv) > 2 else "admin"
+    database_path = sys.argv[3] if len(sys.argv) > 3 else os.path.join("lists", "collections.sqlite3")
+    database = ListDatabase(database_path)
+    if not database.has_user(owner):
+        sys.exit(f"'{owner}' kullanıcısı bulunamadı; önce uygulamayı bir kez başlatın veya kullanıcıyı oluşturun.")
+    result = database.migrate_json_directory(source, owner)
+    print(f"Aktarılan: {len(result['imported'])}, atlanan: {len(result['skipped'])}, "
+          f"başarısız: {len(result['failed'])} ({database_path})")
@@ -0,0 +1,193 @@
+# Hazır kelime listelerinin (lists/main_lists) tek dosyalık, bellek eşlemeli ikili anlık görüntüsü.
+#
+# Oluşturma:  python list_snapshot.py [kaynak_dizin] [çıktı_dosyası]
+#
+# Dosya düzeni (tüm tamsayılar little-endian):
+#   başlık     : MAGIC, sürüm, dize sayısı, liste sayısı, çift sayısı ve bölüm ofsetleri
+#   dize tablosu: (dize sayısı + 1) adet u32 ofset + UTF-8 baytlar; aynı metin tek kez saklanır
+#   çiftler    : u32 anahtar kimlikleri, u32 değer kimlikleri (liste sırasıyla)
+#   sıralı dizin: her liste için çift sıralarının anahtar baytlarına göre sıralı hali (ikili arama için)
+#   liste dizini: ad kimliği, ilk çift, çift sayısı (u32) ve kaynak dosyanın mtime değeri (f64)
+# JSON dosyaları düzenlenebilir tek doğruluk kaynağıdır; mtime'ı değişen liste JSON'dan okunur.
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import ItemsView, Mapping, Sequence
+
+MAGIC = b"BTKLSNP1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIII5Q")
+LIST_RECORD = struct.Struct("<IIId")
+
+
+def build_snapshot(source_dir, output_path):
+    strings = []
+    string_ids = {}
+
+    def intern(text):
+        string_id = string_ids.get(text)
+        if string_id is None:
+            string_id = string_ids[text] = len(strings)
+            strings.append(text.encode("utf-8"))
+        return string_id
+
+    keys, values, sorted_positions, lists = [], [], [], []
+    for file_name in sorted(os.listdir(source_dir)):
+        if not file_name.endswith(".json"):
+            continue
+        path = os.path.join(source_dir, file_name)
+        mtime = os.path.getmtime(path)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        start = len(keys)
+        for key, value in data.items():
+            keys.append(intern(str(key)))
+            values.append(intern(str(value)))
+        count = len(keys) - start
+        sorted_positions.extend(sorted(range(count), key=lambda i: strings[keys[start + i]]))
+        lists.append((intern(file_name[:-5]), start, count, mtime))
+
+    offsets = [0]
+    for encoded in strings:
+        offsets.append(offsets[-1] + len(encoded))
+
+    def u32_array(items):
+        return struct.pack(f"<{len(items)}I", *items)
+
+    sections = [u32_array(offsets), b"".join(strings), u32_array(keys), u32_array(values),
+                u32_array(sorted_positions), b"".join(LIST_RECORD.pack(*record) for record in lists)]
+    section_offsets = []
+    position = HEADER.size + len(sections[0])
+    for section in sections[1:]:
+        position += -position % 4
+        section_offsets.append(position)
+        position += len(section)
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(strings), len(lists), len(keys), *section_offsets))
+        f.write(sections[0])
+        for section, offset in zip(sections[1:], section_offsets):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section)
+    os.replace(tmp_path, output_path)
+    return {"lists": len(lists), "pairs": len(keys), "strings": len(strings), "bytes": os.path.getsize(output_path)}
+
+
+class SnapshotListView(Mapping):
+    # Liste içeriğinin salt okunur görünümü; yalnızca erişilen dizeler çözülür.
+    def __init__(self, snapshot, start, count):
+        self.snapshot = snapshot
+        self.start = start
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def key_at(self, index):
+        return self.snapshot.string(self.snapshot.keys[self.start + index])
+
+    def value_at(self, index):
+        return self.snapshot.string(self.snapshot.values[self.start + index])
+
+    def item(self, index):
+        return self.key_at(index), self.value_at(index)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.key_at(index)
+
+    def __getitem__(self, key):
+        target = str(key).encode("utf-8")
+        snapshot = self.snapshot
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            index = snapshot.sorted_positions[self.start + middle]
+            candidate = bytes(snapshot.string_bytes(snapshot.keys[self.start + index]))
+            if candidate < target:
+                low = middle + 1
+            elif candidate > target:
+                high = middle
+            else:
+                return self.value_at(index)
+        raise KeyError(key)
+
+    def items(self):
+        return SnapshotItemsView(self)
+
+
+class SnapshotItemsView(ItemsView, Sequence):
+    # Çiftler kopyalanmaz; her öğe okunduğu anda mmap'teki ofsetlerden çözülür. Sıra erişimi de
+    # desteklenir, böylece random.sample gibi tüketiciler listeyi belleğe almadan örnek seçebilir.
+    def __iter__(self):
+        view = self._mapping
+        for index in range(len(view)):
+            yield view.item(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._mapping.item(index)
+
+
+class ListSnapshot:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, string_count, list_count, pair_count,
+         blob_offset, keys_offset, values_offset, sorted_offset, lists_offset) = HEADER.unpack_from(self.buffer)
+        # Dizi bölümleri yerel bayt sırasıyla okunur (memoryview.cast).
+        if magic != MAGIC or version != FORMAT_VERSION or sys.byteorder != "little":
+            self.buffer.close()
+            raise ValueError(f"Geçersiz liste anlık görüntüsü: {path}")
+
+        memory = memoryview(self.buffer)
+        self.offsets = memory[HEADER.size:HEADER.size + 4 * (string_count + 1)].cast("I")
+        self.blob = memory[blob_offset:blob_offset + self.offsets[string_count]]
+        self.keys = memory[keys_offset:keys_offset + 4 * pair_count].cast("I")
+        self.values = memory[values_offset:values_offset + 4 * pair_count].cast("I")
+        self.sorted_positions = memory[sorted_offset:sorted_offset + 4 * pair_count].cast("I")
+
+        self.lists = {}
+        for i in range(list_count):
+            name_id, start, count, mtime = LIST_RECORD.unpack_from(self.buffer, lists_offset + i * LIST_RECORD.size)
+            self.lists[self.string(name_id)] = (start, count, mtime)
+
+    @classmethod
+    def open(cls, path):
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Liste anlık görüntüsü yüklenemedi ({path}): {e}")
+            return None
+
+    def string_bytes(self, string_id):
+        return self.blob[self.offsets[string_id]:self.offsets[string_id + 1]]
+
+    def string(self, string_id):
+        return str(self.string_bytes(string_id), "utf-8")
+
+    def view(self, list_name, mtime=None):
+        record = self.lists.get(list_name)
+        if record is None or (mtime is not None and record[2] != mtime):
+            return None
+        return SnapshotListView(self, record[0], record[1])
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join("lists", "main_lists")
+    output = sys.argv[2] if len(sys.argv) > 2 else os.path.join("lists", "main_lists.snapshot")
+    summary = build_snapshot(source, output)
+    print(f"Anlık görüntü oluşturuldu: {output} ({summary['lists']} liste, {summary['pairs']} kelime, "
+          f"{summary['strings']} benzersiz dize, {summary['bytes']} bayt)")
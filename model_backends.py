@@ -0,0 +1,315 @@
+# Model arka uçları. app.py yalnızca şu arayüzü kullanır:
+#   generate_content(prompt, generation_config=None, stream=False)
+#   generate_content_async(prompt, generation_config=None, stream=False)  -> akışta "async for" ile okunur
+#   start_chat(history=None)  -> send_message / send_message_async sunan bir sohbet nesnesi
+#   start_topic_chat(cache_key, preamble) -> konu prompt'uyla açılmış sohbet (destekleniyorsa bağlam önbelleğiyle)
+# MODEL_BACKEND=fake ile API anahtarı gerektirmeyen, deterministik yerel arka uç seçilir.
+import abc
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from google.api_core import exceptions
+
+
+class ModelBackend(abc.ABC):
+    name = "base"
+
+    @abc.abstractmethod
+    def generate_content(self, contents, generation_config=None, stream=False):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def generate_content_async(self, contents, generation_config=None, stream=False):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def start_chat(self, history=None):
+        raise NotImplementedError
+
+    def start_topic_chat(self, cache_key, preamble):
+        # Varsayılan: konu prompt'u sohbetin ilk kullanıcı mesajı olarak her turda yeniden gönderilir.
+        return self.start_chat(history=[{'role': 'user', 'parts': [preamble]}])
+
+    def context_cache_stats(self):
+        return {"enabled": False}
+
+
+class GeminiBackend(ModelBackend):
+    # Önbellekli sohbetlerde ilk mesaj yer tutucudur; konu prompt'u önbellekteki sistem talimatındadır.
+    CACHED_PREAMBLE_MESSAGE = "Ders talimatları sistem talimatında verildi; onlara göre devam et."
+
+    def __init__(self, model_name, api_key, context_cache_min_tokens=1024, context_cache_ttl_seconds=3600):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.genai = genai
+        self.name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        # Bağlam önbelleği (genai.caching) SDK'nın yeni sürümlerinde vardır; yoksa tam prompt gönderilir.
+        self.context_cache_supported = hasattr(genai, "caching")
+        self.context_cache_min_tokens = context_cache_min_tokens
+        self.context_cache_ttl_seconds = context_cache_ttl_seconds
+        self.context_cache_lock = threading.Lock()
+        self.cached_models = {}
+        # Oluşturulmakta olan önbellekler: aynı konu için tek ağ çağrısı yapılır, diğerleri onu bekler.
+        self.context_cache_pending = {}
+        self.context_cache_counters = {"created": 0, "hits": 0, "skipped_short": 0, "failures": 0}
+
+    @classmethod
+    def from_env(cls, model_name, api_key):
+        return cls(model_name, api_key,
+                   context_cache_min_tokens=int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", "1024")),
+                   context_cache_ttl_seconds=int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600")))
+
+    def generate_content(self, contents, generation_config=None, stream=False):
+        return self.model.generate_content(contents, generation_config=generation_config, stream=stream)
+
+    async def generate_content_async(self, contents, generation_config=None, stream=False):
+        return await self.model.generate_content_async(contents, generation_config=generation_config, stream=stream)
+
+    def start_chat(self, history=None):
+        return self.model.start_chat(history=history)
+
+    def cached_model(self, cache_key, preamble):
+        if not self.context_cache_supported:
+            return None
+        # Kısa prompt'lar API'nin önbellek alt sınırının altında kalır; bunlar için önbellek açılmaz.
+        if len(preamble) // 4 + 1 < self.context_cache_min_tokens:
+            with self.context_cache_lock:
+                self.context_cache_counters["skipped_short"] += 1
+            return None
+
+        while True:
+            now = time.monotonic()
+            with self.context_cache_lock:
+                entry = self.cached_models.get(cache_key)
+                if entry is not None and entry[1] > now:
+                    if entry[0] is not None:
+                        self.context_cache_counters["hits"] += 1
+                    return entry[0]
+                pending = self.context_cache_pending.get(cache_key)
+                if pending is None:
+                    pending = self.context_cache_pending[cache_key] = threading.Event()
+                    break
+            # Başka bir istek bu konunun önbelleğini oluşturuyor; bittiğinde sonuç yeniden okunur.
+            pending.wait()
+
+        # Ağ çağrısı kilit dışında yapılır; sonuç kilit altında yayımlanır.
+        # Süre dolmadan yenilenir; başarısız denemeler de aynı süre boyunca tekrarlanmaz.
+        expires_at = now + self.context_cache_ttl_seconds * 0.9
+        cached_model = None
+        try:
+            cached_content = self.genai.caching.CachedContent.create(
+                model=f"models/{self.name}", system_instruction=preamble,
+                ttl=datetime.timedelta(seconds=self.context_cache_ttl_seconds))
+            cached_model = self.genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+        except Exception as e:
+            print(f"Bağlam önbelleği oluşturulamadı, tam prompt kullanılacak: {e}")
+        finally:
+            with self.context_cache_lock:
+                self.cached_models[cache_key] = (cached_model, expires_at)
+                self.context_cache_counters["created" if cached_model is not None else "failures"] += 1
+                del self.context_cache_pending[cache_key]
+            pending.set()
+        return cached_model
+
+    def start_topic_chat(self, cache_key, preamble):
+        cached_model = self.cached_model(cache_key, preamble)
+        if cached_model is None:
+            return super().start_topic_chat(cache_key, preamble)
+        return cached_model.start_chat(history=[{'role': 'user', 'parts': [self.CACHED_PREAMBLE_MESSAGE]}])
+
+    def context_cache_stats(self):
+        with self.context_cache_lock:
+            return {
+                "enabled": self.context_cache_supported,
+                "min_tokens": self.context_cache_min_tokens,
+                "ttl_seconds": self.context_cache_ttl_seconds,
+                "cached_topics": sum(1 for model, _ in self.cached_models.values() if model is not None),
+                **self.context_cache_counters
+            }
+
+
+class FakePart:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeContent:
+    def __init__(self, role, text):
+        self.role = role
+        self.parts = [FakePart(text)]
+
+
+class FakeUsage:
+    def __init__(self, prompt_text, output_text):
+        self.prompt_token_count = len(prompt_text) // 4 + 1
+        self.candidates_token_count = len(output_text) // 4 + 1
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+
+class FakeResponse:
+    def __init__(self, text, prompt_text=""):
+        self.text = text
+        self.usage_metadata = FakeUsage(prompt_text, text)
+
+    def __iter__(self):
+        # Akış modunda metin birkaç parça halinde döner.
+        step = max(1, len(self.text) // 4)
+        for i in range(0, len(self.text), step):
+            yield FakePart(self.text[i:i + step])
+
+    async def __aiter__(self):
+        for part in self:
+            yield part
+
+
+class FakeChatSession:
+    def __init__(self, backend, history=None):
+        self.backend = backend
+        self.history = history
+
+    @property
+    def history(self):
+        return self._history
+
+    @history.setter
+    def history(self, history):
+        # Gemini SDK'sı gibi hem sözlük hem içerik nesnesi kabul edilir.
+        self._history = [FakeContent(item['role'], "".join(item['parts'])) if isinstance(item, dict) else item
+                         for item in history or []]
+
+    def _reply(self, message):
+        reply = f"Great, let's keep practicing! You said: {message[:60]} (turn {len(self.history) // 2 + 1})"
+        self.history.append(FakeContent('user', message))
+        self.history.append(FakeContent('model', reply))
+        return FakeResponse(reply, message)
+
+    def send_message(self, message, stream=False):
+        self.backend.wait(message)
+        return self._reply(message)
+
+    async def send_message_async(self, message):
+        await self.backend.wait_async(message)
+        return self._reply(message)
+
+
+class FakeBackend(ModelBackend):
+    name = "fake"
+    error_classes = {"unavailable": exceptions.ServiceUnavailable, "quota": exceptions.ResourceExhausted}
+
+    def __init__(self, latency_ms=200.0, jitter_ms=50.0, error_rate=0.0, error_kind="unavailable", seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_class = self.error_classes[error_kind]
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.responders = [
+            ('"word": "', self.quiz_question_batch),
+            ('"question_sentence"', self.quiz_question),
+            ('{"text":', self.structured_text),
+            ('"öğe": "çevirisi"', self.batch_translation),
+        ]
+
+    @classmethod
+    def from_env(cls):
+        return cls(latency_ms=float(os.getenv("FAKE_MODEL_LATENCY_MS", "200")),
+                   jitter_ms=float(os.getenv("FAKE_MODEL_JITTER_MS", "50")),
+                   error_rate=float(os.getenv("FAKE_MODEL_ERROR_RATE", "0")),
+                   error_kind=os.getenv("FAKE_MODEL_ERROR_KIND", "unavailable"),
+                   seed=int(os.getenv("FAKE_MODEL_SEED", "0")))
+
+    @staticmethod
+    def digest(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def latency_seconds(self, prompt_text):
+        # Gecikme prompt'tan türetilir; aynı prompt her çalıştırmada aynı süreyi bekler.
+        jitter = (int(self.digest(prompt_text)[:8], 16) % 2001 - 1000) / 1000 * self.jitter_ms
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def check_error(self):
+        with self.lock:
+            self.calls += 1
+            failed = self.random.random() < self.error_rate
+        if failed:
+            raise self.error_class("Sahte arka uç tarafından enjekte edilen hata.")
+
+    def wait(self, prompt_text):
+        self.check_error()
+        time.sleep(self.latency_seconds(prompt_text))
+
+    async def wait_async(self, prompt_text):
+        self.check_error()
+        await asyncio.sleep(self.latency_seconds(prompt_text))
+
+    def quiz_question(self, prompt_text):
+        target = re.search(r"Kelime: '([^']*)'", prompt_text)
+        level = re.search(r"CEFR (\S+) seviyesinde", prompt_text)
+        word = target.group(1) if target else "word"
+        return json.dumps({
+            "question_sentence": f"In this {level.group(1) if level else 'B1'} sentence, the missing word is ___.",
+            "correct_answer": word,
+            "distractor1": f"{word}ness",
+            "distractor2": f"un{word}"
+        })
+
+    def quiz_question_batch(self, prompt_text):
+        words = re.search(r"Kelimeler: (\[.*?\])\d\.", prompt_text)
+        level = re.search(r"CEFR (\S+) seviyesinde", prompt_text)
+        questions = []
+        for word in json.loads(words.group(1)) if words else []:
+            questions.append({
+                "word": word,
+                "question_sentence": f"In this {level.group(1) if level else 'B1'} sentence, the missing word is ___.",
+                "correct_answer": word,
+                "distractor1": f"{word}ness",
+                "distractor2": f"un{word}"
+            })
+        return json.dumps(questions, ensure_ascii=False)
+
+    def structured_text(self, prompt_text):
+        words = re.search(r"kelimeler etrafında[^:]*: (.+?)\d\.", prompt_text)
+        topic = words.group(1) if words else "practice"
+        return json.dumps({"text": f"This is a short text about {topic}. It is written for offline benchmarks."})
+
+    def batch_translation(self, prompt_text):
+        arrays = re.findall(r"\[[^\[\]]*\]", prompt_text)
+        items = json.loads(arrays[-1]) if arrays else []
+        return json.dumps({item: f"{item} (çeviri)" for item in items}, ensure_ascii=False)
+
+    def respond(self, prompt_text):
+        for marker, responder in self.responders:
+            if marker in prompt_text:
+                return responder(prompt_text)
+        return f"Fake response {self.digest(prompt_text)[:12]}"
+
+    def generate_content(self, contents, generation_config=None, stream=False):
+        prompt_text = str(contents)
+        self.wait(prompt_text)
+        return FakeResponse(self.respond(prompt_text), prompt_text)
+
+    async def generate_content_async(self, contents, generation_config=None, stream=False):
+        prompt_text = str(contents)
+        await self.wait_async(prompt_text)
+        return FakeResponse(self.respond(prompt_text), prompt_text)
+
+    def start_chat(self, history=None):
+        return FakeChatSession(self, history)
+
+
+def create_model_backend(backend_name, model_name, api_key=None):
+    if backend_name == "fake":
+        return FakeBackend.from_env()
+    if backend_name == "gemini":
+        return GeminiBackend.from_env(model_name, api_key)
+    raise ValueError(f"Bilinmeyen model arka ucu: {backend_name}")